@@ -0,0 +1,76 @@
+"""
+Connections opened and wall-clock time of `apply` over a generated
+deployment tree against the local stand-in server.
+
+    python benchmarks/bench_apply.py --entries 200
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mist import cli  # noqa: E402
+from mist.app import MistApp  # noqa: E402
+from mist.transport import Transport  # noqa: E402
+
+from stub_server import StubServer  # noqa: E402
+
+
+class ConnectionPerRequestTransport(Transport):
+    """Behaviour before the pooled transport: module level requests calls."""
+
+    def request(self, method, url, **kwargs):
+        return requests.request(method, url, **kwargs)
+
+
+def generate_tree(root, entries):
+    for i in range(entries):
+        job_dir = os.path.join(root, 'job-{}'.format(i))
+        os.makedirs(job_dir)
+        with open(os.path.join(job_dir, 'job.py'), 'w') as f:
+            f.write('print("job {}")\n'.format(i))
+        with open(os.path.join(job_dir, '00artifact.conf'), 'w') as f:
+            f.write('model = Artifact\nname = job-{i}\nversion = 0.0.1\ndata.file-path = "{path}"\n'.format(
+                i=i, path=os.path.join(job_dir, 'job.py')))
+        with open(os.path.join(job_dir, '10context.conf'), 'w') as f:
+            f.write('model = Context\nname = ctx-{}\ndata.worker-mode = shared\n'.format(i))
+        with open(os.path.join(job_dir, '20function.conf'), 'w') as f:
+            f.write('model = Function\nname = fn-{i}\ndata {{\n  path = job-{i}_0.0.1.py\n'
+                    '  class-name = Job\n  context = ctx-{i}\n}}\n'.format(i=i))
+
+
+def run(root, transport):
+    with StubServer() as server:
+        mist_app = MistApp(port=server.port, transport=transport)
+        deployments = sorted(map(mist_app.parse_deployment, cli.easy_glob(root, '*.conf')), key=lambda t: t[0])
+        started = time.time()
+        with_errors = mist_app.update_deployments([d for _, d in deployments])
+        elapsed = time.time() - started
+        transport.close()
+        return with_errors, server.connections, server.requests, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--entries', type=int, default=100)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        generate_tree(root, args.entries)
+        for label, transport in (('before', ConnectionPerRequestTransport()), ('after', Transport())):
+            with_errors, connections, reqs, elapsed = run(root, transport)
+            print('{:<7} errors={} requests={} connections={} time={:.3f}s'.format(
+                label, with_errors, reqs, connections, elapsed))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Finding deployment configs in a project tree as apply does: the previous
+os.walk with fnmatch over the whole tree, against find_files with scandir,
+default ignore rules pruning .git, target and node_modules, and the time
+to the first path, which apply starts parsing while the walk goes on.
+
+    python benchmarks/bench_discovery.py --dirs 500 --noise 20000
+"""
+import argparse
+import fnmatch
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mist.discovery import IgnoreRules, find_files  # noqa: E402
+
+
+def legacy_glob(root, pattern):
+    matches = []
+    for root, _, filenames in os.walk(root):
+        for filename in fnmatch.filter(filenames, pattern):
+            matches.append(os.path.join(root, filename))
+    return matches
+
+
+def touch(path):
+    with open(path, 'w'):
+        pass
+
+
+def generate(root, dirs, noise):
+    for i in range(dirs):
+        directory = os.path.join(root, 'jobs', 'job-{}'.format(i))
+        os.makedirs(directory)
+        for name in ('00artifact.conf', '10context.conf', '20function.conf'):
+            touch(os.path.join(directory, name))
+    # build outputs, dependencies and vcs objects, 50 files per directory
+    for i in range(noise // 50):
+        directory = os.path.join(root, ('target', 'node_modules', '.git')[i % 3], 'd{}'.format(i))
+        os.makedirs(directory)
+        for j in range(50):
+            touch(os.path.join(directory, 'f{}.conf'.format(j) if j % 5 == 0 else 'f{}.class'.format(j)))
+
+
+def timed(label, fn):
+    started = time.time()
+    result = fn()
+    print('{:<36} {:.3f}s'.format(label, time.time() - started))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dirs', type=int, default=500, help='Number of job directories of 3 confs each')
+    parser.add_argument('--noise', type=int, default=20000, help='Number of files in ignored directories')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        generate(root, args.dirs, args.noise)
+        legacy = timed('os.walk + fnmatch', lambda: legacy_glob(root, '*.conf'))
+        found = timed('scandir, no ignore rules', lambda: list(find_files(root, '*.conf')))
+        assert sorted(legacy) == sorted(found)
+        ignore = IgnoreRules.load(root)
+        pruned = timed('scandir, default ignore rules', lambda: list(find_files(root, '*.conf', ignore)))
+        timed('first path, default ignore rules', lambda: next(find_files(root, '*.conf', ignore)))
+        print('{} confs found, {} outside ignored directories'.format(len(legacy), len(pruned)))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
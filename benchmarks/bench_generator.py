@@ -0,0 +1,84 @@
+"""
+Generating requests for a nested function schema: the previous recursive
+generate_value that dispatches on type names for every value, against a
+schema compiled once by RequestGenerator, one by one and in batches.
+
+    python benchmarks/bench_generator.py --requests 200000
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mist.generator import RequestGenerator  # noqa: E402
+
+SCHEMA = {
+    'numbers': {'type': 'MList', 'args': [{'type': 'MInt'}]},
+    'multiplier': {'type': 'MOption', 'args': [{'type': 'MDouble'}]},
+    'name': {'type': 'MString'},
+    'options': {'type': 'MMap', 'args': [{'type': 'MString'}, {'type': 'MAny'}]},
+    'point': {'type': 'MObj', 'fields': {
+        'x': {'type': 'MDouble'}, 'y': {'type': 'MDouble'}, 'tags': {'type': 'MList', 'args': [{'type': 'MString'}]}
+    }},
+}
+
+
+def legacy_generate_value(param_type):
+    t = param_type['type']
+    args = param_type.get('args', [])
+
+    if t == 'MObj':
+        return {k: legacy_generate_value(v) for k, v in param_type.get('fields', {}).items()}
+    if t == 'MMap':
+        return {legacy_generate_value(args[0]): legacy_generate_value(args[1])}
+    if t == 'MList':
+        return [legacy_generate_value(args[0])]
+    if t == 'MOption':
+        return legacy_generate_value(args[0])
+
+    if t == 'MString':
+        return 'string'
+    if t == 'MAny':
+        return {}
+    if t == 'MInt':
+        return math.ceil(random.random() * 10)
+    if t == 'MDouble':
+        return random.random()
+
+
+def legacy_generate_request(execute):
+    return dict((key, legacy_generate_value(value)) for key, value in execute.items())
+
+
+def measure(name, count, fn):
+    started = time.time()
+    fn()
+    elapsed = time.time() - started
+    print('{:<28} {:>8.3f} s {:>12.0f} requests/s'.format(name, elapsed, count / elapsed))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200000)
+    parser.add_argument('--batch', type=int, default=10000)
+    opts = parser.parse_args()
+    n = opts.requests
+
+    legacy = measure('recursive', n, lambda: [legacy_generate_request(SCHEMA) for _ in range(n)])
+    generator = RequestGenerator(SCHEMA, seed=42)
+    compiled = measure('compiled', n, lambda: [generator.generate() for _ in range(n)])
+    batched = measure('compiled, batches of {}'.format(opts.batch), n,
+                      lambda: [generator.generate_batch(opts.batch) for _ in range(n // opts.batch)])
+    print('speedup: {:.1f}x compiled, {:.1f}x batched'.format(legacy / compiled, legacy / batched))
+
+    sized = RequestGenerator(SCHEMA, seed=42, min_size=0, max_size=20, string_length=8)
+    measure('compiled, 0-20 elements', n // 10, lambda: sized.generate_batch(n // 10))
+
+
+if __name__ == '__main__':
+    main()
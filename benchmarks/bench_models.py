@@ -0,0 +1,105 @@
+"""
+Building Job objects from json pages as list jobs does: the previous
+__dict__ based Job with eager datetime conversion, against the slotted
+Job with interned strings and lazy timestamps. Reports build time and
+memory held by the built jobs, measured with tracemalloc in a separate run.
+
+    python benchmarks/bench_models.py --jobs 1000000
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mist.models import Job  # noqa: E402
+
+PAGE_SIZE = 1000
+
+
+class LegacyJob(object):
+    def __init__(self, job_id, function_id, context, source, status, external_id=None, start_time=None):
+        self.job_id = job_id
+        self.function = function_id
+        self.context = context
+        self.source = source
+        self.status = status
+        if external_id is None:
+            external_id = ''
+        self.external_id = external_id
+        if start_time is not None:
+            start_time = datetime.datetime.fromtimestamp(start_time / 1000.0)
+        self.start_time = start_time
+
+    @staticmethod
+    def from_json(data):
+        return LegacyJob(
+            data['jobId'], data['function'], data['context'],
+            data['source'], data['status'], data.get('externalId', ''),
+            data.get('startTime', None)
+        )
+
+
+def page_text():
+    return json.dumps([{
+        'jobId': '3f1d2c7e-0000-4000-8000-{:012d}'.format(i),
+        'function': 'spark-pi-{}'.format(i % 5),
+        'context': 'default' if i % 2 else 'streaming',
+        'source': 'http',
+        'status': 'finished' if i % 10 else 'failed',
+        'externalId': '',
+        'startTime': 1500000000000 + i,
+    } for i in range(PAGE_SIZE)])
+
+
+def build(model, text, count):
+    jobs = []
+    for _ in range(count // PAGE_SIZE):
+        jobs.extend(map(model.from_json, json.loads(text)))
+    return jobs
+
+
+def measure(name, model, text, count):
+    items = json.loads(text)
+    gc.collect()
+    started = time.time()
+    for _ in range(count // PAGE_SIZE):
+        jobs = list(map(model.from_json, items))
+    from_json = time.time() - started
+
+    gc.collect()
+    started = time.time()
+    jobs = build(model, text, count)
+    elapsed = time.time() - started
+    del jobs
+
+    gc.collect()
+    tracemalloc.start()
+    jobs = build(model, text, count)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('{:<8} {:>8.2f} s {:>10.0f} jobs/s {:>8.2f} s from_json only {:>8.1f} MB held'.format(
+        name, elapsed, len(jobs) / elapsed, from_json, held / 2.0 ** 20))
+    del jobs
+    return elapsed, from_json, held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=1000000)
+    opts = parser.parse_args()
+
+    text = page_text()
+    legacy_time, legacy_from_json, legacy_mem = measure('legacy', LegacyJob, text, opts.jobs)
+    new_time, new_from_json, new_mem = measure('slotted', Job, text, opts.jobs)
+    print('parse and build {:.2f}x faster, from_json {:.2f}x faster, {:.2f}x less memory'.format(
+        legacy_time / new_time, legacy_from_json / new_from_json, float(legacy_mem) / new_mem))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Parsing a generated tree of deployment configs as apply does: the previous
+serial parse_deployment of every file, parse_deployments on a process pool
+with a cold parse cache, and a warm persisted cache after one conf changed.
+Every context includes a shared spark-conf file.
+
+    python benchmarks/bench_parse.py --dirs 1000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mist.app import MistApp  # noqa: E402
+from mist.cli import easy_glob  # noqa: E402
+from mist.parse_cache import ParseCache  # noqa: E402
+
+ARTIFACT = '''model = Artifact
+version = 0.0.{i}
+data.file-path = "./target/job-{i}.jar"
+'''
+
+CONTEXT = '''model = Context
+include "../spark.conf"
+data {{
+    worker-mode = shared
+    max-parallel-jobs = {i}
+    downtime = Inf
+    precreated = false
+    streaming-duration = 1s
+    spark-conf = ${{spark-conf}}
+    run-options = ""
+}}
+'''
+
+FUNCTION = '''model = Function
+data {{
+    path = job-{i}_0.0.{i}.jar
+    class-name = "example.Job{i}$"
+    context = job-{i}
+}}
+'''
+
+SPARK = '''spark-conf {
+    spark.driver.memory = "512m"
+    spark.executor.memory = "256m"
+    spark.executor.cores = 2
+}
+'''
+
+
+def generate(root, dirs):
+    with open(os.path.join(root, 'spark.conf'), 'w') as f:
+        f.write(SPARK)
+    for i in range(dirs):
+        directory = os.path.join(root, 'job-{}'.format(i))
+        os.mkdir(directory)
+        for name, template in (('00artifact.conf', ARTIFACT), ('10context.conf', CONTEXT),
+                               ('20function.conf', FUNCTION)):
+            with open(os.path.join(directory, name), 'w') as f:
+                f.write(template.format(i=i))
+
+
+def timed(label, fn):
+    started = time.time()
+    result = fn()
+    print('{:<36} {:.3f}s'.format(label, time.time() - started))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dirs', type=int, default=1000, help='Number of job directories of 3 confs each')
+    parser.add_argument('--processes', type=int, default=None, help='Parse pool size, cpu count by default')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        generate(root, args.dirs)
+        conf_root = os.path.join(root, '.')
+        paths = [p for p in easy_glob(conf_root, '*.conf') if os.path.basename(p) != 'spark.conf']
+        cache_path = os.path.join(root, 'parse-cache.json')
+        print('{} confs'.format(len(paths)))
+
+        serial = timed('serial parse_deployment', lambda: [MistApp.parse_deployment(p) for p in paths])
+
+        mist_app = MistApp()
+        mist_app.parse_cache = ParseCache(cache_path)
+        parallel = timed('process pool, cold cache', lambda: list(mist_app.parse_deployments(paths, args.processes)))
+        mist_app.parse_cache.save()
+        assert [(o, d.name, d.data) for o, d in serial] == [(o, d.name, d.data) for o, d in parallel]
+
+        with open(paths[0], 'a') as f:
+            f.write('\n# changed\n')
+        mist_app.parse_cache = timed('load persisted cache', lambda: ParseCache(cache_path).load())
+        warm = timed('warm cache, one conf changed', lambda: list(mist_app.parse_deployments(paths, args.processes)))
+        assert len(warm) == len(paths)
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
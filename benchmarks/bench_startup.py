@@ -0,0 +1,64 @@
+"""
+Cold start of `mist-cli --help` measured with `python -X importtime`.
+Exits with status 1 when the median cumulative import time of mist.cli
+exceeds the budget, so it can guard against regressions in CI.
+
+    python benchmarks/bench_startup.py --runs 5 --budget-ms 100
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = 'from mist.cli import mist_cli; mist_cli({!r}, prog_name="mist-cli")'
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def import_times(args):
+    """
+    :param args: mist-cli arguments
+    :return: module name -> cumulative import time in microseconds, for top level imports
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', SCRIPT.format(args)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env, cwd=ROOT
+    )
+    _, err = proc.communicate()
+    times = dict()
+    for line in err.decode('utf-8').splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is not None:
+            times[match.group(4)] = int(match.group(2))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=100.0)
+    parser.add_argument('--top', type=int, default=10, help='number of slowest imports to print')
+    parser.add_argument('args', nargs='*', default=['--help'], help='mist-cli arguments')
+    opts = parser.parse_args()
+
+    runs = [import_times(opts.args) for _ in range(opts.runs)]
+    totals = sorted(r.get('mist.cli', 0) / 1000.0 for r in runs)
+    median = totals[len(totals) // 2]
+
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)[:opts.top]
+    for name, us in slowest:
+        print('{:>10.1f} ms  {}'.format(us / 1000.0, name))
+    print('mist-cli {}: import of mist.cli {:.1f} ms (median of {}), budget {:.1f} ms'.format(
+        ' '.join(opts.args), median, opts.runs, opts.budget_ms))
+
+    if median > opts.budget_ms:
+        print('startup budget exceeded')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Peak memory of uploading sparse artifacts of growing size to the local
+stand-in server. Every size runs in a fresh process, so ru_maxrss is the
+peak of that single upload.
+
+    python benchmarks/bench_upload.py --sizes-mb 256 1024 4096
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mist import models  # noqa: E402
+from mist.app import MistApp  # noqa: E402
+
+from stub_server import StubServer  # noqa: E402
+
+
+def upload(size_mb):
+    fd, path = tempfile.mkstemp(suffix='.jar')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.truncate(size_mb * 2 ** 20)
+        with StubServer() as server:
+            mist_app = MistApp(port=server.port)
+            started = time.time()
+            mist_app._MistApp__upload_artifact(models.Artifact('sparse', path))
+            elapsed = time.time() - started
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+        print('size={}MB time={:.2f}s throughput={:.1f}MB/s peak_rss={:.1f}MB'.format(
+            size_mb, elapsed, size_mb / elapsed, peak_mb))
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes-mb', type=int, nargs='+', default=[64, 512, 2048])
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.single:
+        upload(args.sizes_mb[0])
+        return
+    for size_mb in args.sizes_mb:
+        subprocess.check_call([sys.executable, __file__, '--single', '--sizes-mb', str(size_mb)])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+In-process stand-in for the mist master HTTP API used by the benchmarks.
+
+It keeps functions, contexts and artifacts in memory, counts accepted
+connections and can add an artificial delay to every response. Jobs started
+asynchronously finish job_duration seconds after start, when it is set.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, unquote, parse_qs
+except ImportError:  # pragma: no cover
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qs
+    from urllib import unquote
+
+API = '/v2/api/'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=b'', content_type='application/json'):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.requests += 1
+
+    def _chunks(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return
+                yield self.rfile.read(size)
+                self.rfile.readline()
+        remaining = int(self.headers.get('Content-Length', 0))
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 2 ** 20))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+    def _json_body(self):
+        body = b''.join(self._chunks())
+        return json.loads(body.decode('utf-8')) if body else {}
+
+    def _receive_artifact(self):
+        boundary = re.search('boundary=(.+)', self.headers['Content-Type']).group(1).encode('ascii')
+        trailer = b'\r\n--' + boundary + b'--\r\n'
+        sha1 = hashlib.sha1()
+        buf = b''
+        filename = None
+        for chunk in self._chunks():
+            buf += chunk
+            if filename is None:
+                end = buf.find(b'\r\n\r\n')
+                if end == -1:
+                    continue
+                filename = re.search(b'filename="([^"]+)"', buf[:end]).group(1).decode('utf-8')
+                buf = buf[end + 4:]
+            if len(buf) > len(trailer):
+                sha1.update(buf[:-len(trailer)])
+                buf = buf[-len(trailer):]
+        sha1.update(buf[:-len(trailer)])
+        return filename, sha1.hexdigest()
+
+    def _route(self):
+        parsed = urlparse(self.path)
+        parts = [unquote(p) for p in parsed.path[len(API):].split('/')]
+        return parts, parse_qs(parsed.query)
+
+    def do_GET(self):
+        state = self.server.state
+        parts, query = self._route()
+        if parts == ['status']:
+            return self._reply(200, {'mistVersion': 'stub'})
+        if parts[0] in ('functions', 'contexts') and len(parts) == 1:
+            return self._reply(200, list(state[parts[0]].values()))
+        if parts[0] in ('functions', 'contexts') and len(parts) == 2:
+            item = state[parts[0]].get(parts[1])
+            return self._reply(200, item) if item is not None else self._reply(404, b'')
+        if parts[0] == 'artifacts' and len(parts) == 3:
+            sha = state['artifacts'].get(parts[1])
+            return self._reply(200, sha.encode('ascii'), 'text/plain') if sha else self._reply(404, b'')
+        if parts == ['workers']:
+            return self._reply(200, list(state['workers'].values()))
+        if parts == ['jobs']:
+            statuses = query.get('status', [])
+            jobs = [j for j in state['jobs'].values() if not statuses or j['status'] in statuses]
+            offset = int(query.get('offset', [0])[0])
+            limit = int(query.get('limit', [len(jobs)])[0])
+            return self._reply(200, jobs[offset:offset + limit])
+        if parts[0] == 'jobs' and len(parts) == 2:
+            job = state['jobs'].get(parts[1])
+            duration = self.server.job_duration
+            if job is not None and duration is not None and job['status'] in ('queued', 'started'):
+                elapsed = time.time() - job['startTime'] / 1000.0
+                job['status'] = 'finished' if elapsed >= duration else 'started'
+            return self._reply(200, job) if job is not None else self._reply(404, b'')
+        return self._reply(404, b'')
+
+    def do_POST(self):
+        state = self.server.state
+        parts, query = self._route()
+        if parts == ['artifacts']:
+            filename, sha = self._receive_artifact()
+            if filename in state['artifacts'] and query.get('force') != ['True']:
+                return self._reply(409, b'')
+            state['artifacts'][filename] = sha
+            return self._reply(200, filename.encode('utf-8'), 'text/plain')
+        if parts in (['functions'], ['contexts']):
+            item = self._json_body()
+            state[parts[0]][item['name']] = item
+            return self._reply(200, item)
+        if parts[0] == 'functions' and len(parts) == 3:
+            params = self._json_body()
+            job_id = str(uuid.uuid4())
+            sync = query.get('force') == ['true']
+            state['jobs'][job_id] = {
+                'jobId': job_id, 'function': parts[1], 'context': 'default', 'source': 'http',
+                'status': 'finished' if sync else 'queued', 'startTime': int(time.time() * 1000),
+                'jobResult': params
+            }
+            if sync:
+                return self._reply(200, {'success': True, 'payload': params, 'errors': []})
+            return self._reply(200, {'id': job_id})
+        return self._reply(404, b'')
+
+    def do_PUT(self):
+        parts, _ = self._route()
+        if parts == ['functions']:
+            item = self._json_body()
+            self.server.state['functions'][item['name']] = item
+            return self._reply(200, item)
+        return self._reply(404, b'')
+
+    def do_DELETE(self):
+        state = self.server.state
+        parts, _ = self._route()
+        if parts[0] in ('jobs', 'workers') and len(parts) == 2 and parts[1] in state[parts[0]]:
+            state[parts[0]].pop(parts[1])
+            return self._reply(200, b'')
+        return self._reply(404, b'')
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay=0.0, job_duration=None):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubHandler)
+        self.delay = delay
+        self.job_duration = job_duration
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.state = dict(functions={}, contexts={}, artifacts={}, workers={}, jobs={})
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
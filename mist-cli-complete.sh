@@ -1,8 +1,43 @@
 _mist_cli_completion() {
-    COMPREPLY=( $( env COMP_WORDS="${COMP_WORDS[*]}" \
-                   COMP_CWORD=$COMP_CWORD \
-                   _MIST_CLI_COMPLETE=complete $1 ) )
+    local IFS=$'\n'
+    local response
+
+    # click 8 answers bash_complete with type,value lines, older click answers complete with plain words
+    # and ignores bash_complete, click 8 prints nothing for complete
+    if [[ -z $_MIST_CLI_COMPLETE_INSTR ]]; then
+        if [[ -n $(env COMP_WORDS="$1 " COMP_CWORD=1 _MIST_CLI_COMPLETE=complete $1 2>/dev/null) ]]; then
+            _MIST_CLI_COMPLETE_INSTR=complete
+        else
+            _MIST_CLI_COMPLETE_INSTR=bash_complete
+        fi
+    fi
+
+    response=$(env COMP_WORDS="${COMP_WORDS[*]}" COMP_CWORD=$COMP_CWORD _MIST_CLI_COMPLETE=$_MIST_CLI_COMPLETE_INSTR $1)
+
+    if [[ $_MIST_CLI_COMPLETE_INSTR == 'complete' ]]; then
+        COMPREPLY=($response)
+        return 0
+    fi
+
+    for completion in $response; do
+        IFS=',' read type value <<< "$completion"
+
+        if [[ $type == 'dir' ]]; then
+            COMPREPLY=()
+            compopt -o dirnames
+        elif [[ $type == 'file' ]]; then
+            COMPREPLY=()
+            compopt -o default
+        elif [[ $type == 'plain' ]]; then
+            COMPREPLY+=($value)
+        fi
+    done
+
     return 0
 }
 
-complete -F _mist_cli_completion -o default mist-cli;
+_mist_cli_completion_setup() {
+    complete -o nosort -F _mist_cli_completion mist-cli
+}
+
+_mist_cli_completion_setup;
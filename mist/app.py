@@ -1,13 +1,16 @@
-import hashlib
 import json
 import os
 
 import click
-import requests
-from pyhocon import ConfigFactory, ConfigTree
 
 from . import format_request_error
+from mist.apply_state import deployment_digest
+from mist.executor import DependencyExecutor, DependencyFailedException, deployment_dependencies
+from mist.hashing import HashCache, sha1_file, stat_key
 from mist.models import Function, Context, Worker, Job, Deployment, Artifact
+from mist.parse_cache import from_entry, parse_entry, to_entry
+from mist.remote_state import RemoteState
+from mist.upload import MultipartFileEncoder, UploadProgress
 
 try:  # pragma: no cover
     from urllib.parse import quote
@@ -38,6 +41,8 @@ class FunctionParser(NamedConfigParser):
 
 
 def parse_spark_config(value, key_prefix):
+    from pyhocon import ConfigTree
+
     if isinstance(value, ConfigTree):
         res = dict()
         for k in value.keys():
@@ -94,23 +99,28 @@ class FileExistsException(Exception):
 
 
 def calculate_sha1(file_path):
-    sha1sum = hashlib.sha1()
-    with open(file_path, 'rb') as source:
-        block = source.read(2 ** 16)
-        while len(block) != 0:
-            sha1sum.update(block)
-            block = source.read(2 ** 16)
-    return sha1sum.hexdigest()
+    return sha1_file(file_path)
+
+
+def same_sha1(remote_sha, local_sha):
+    if remote_sha is None or local_sha is None:
+        return False
+    return remote_sha.strip().lower() == local_sha.lower()
 
 
 class MistApp(object):
+    # deployment files parsed in process before a parse pool is started
+    INLINE_PARSES = 16
+
     def __init__(
             self,
             host='localhost',
             port=2004,
             accept_all=False,
             format_table=False,
-            validate=True
+            validate=True,
+            transport=None,
+            parallelism=1
     ):
         self.host = host
         self.port = port
@@ -120,10 +130,53 @@ class MistApp(object):
         self.context_parser = ContextParser()
         self.artifact_parser = ArtifactParser()
         self.validate = validate
+        self.parallelism = parallelism
+        self.remote_state = None
+        self.apply_state = None
+        self.cache_dir = None
+        self.hashes = HashCache()
+        self.parse_cache = None
+        self.transport_options = dict()
+        self._transport = transport
+
+    @property
+    def transport(self):
+        """
+        Created on first use from transport_options, so commands that never
+        talk to mist do not import the http stack.
+        :rtype: mist.transport.Transport
+        """
+        if self._transport is None:
+            from mist.transport import Transport
+            self._transport = Transport.create(**self.transport_options)
+        return self._transport
+
+    @transport.setter
+    def transport(self, transport):
+        self._transport = transport
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+
+    def _request(self, method, path, *args, **kwargs):
+        """
+        :param method: http method
+        :param path: api path template relative to /v2/api, e.g. functions/{}
+        :param args: path parameters, url quoted before substitution
+        :param kwargs: extra arguments passed to transport
+        :rtype: requests.Response
+        """
+        url = 'http://{}:{}/v2/api/{}'.format(
+            self.host, self.port, path.format(*[quote(a, safe='') for a in args])
+        )
+        return self.transport.request(method, url, template=path, **kwargs)
 
     @staticmethod
     def parse_deployment(deployment_conf):
 
+        from pyhocon import ConfigFactory, ConfigTree
+
         cfg = ConfigFactory.parse_file(deployment_conf)
         model_type = cfg['model']
         name = cfg.get_string('name', os.path.basename(os.path.dirname(deployment_conf)))
@@ -139,6 +192,60 @@ class MistApp(object):
             version
         )
 
+    def parse_deployments(self, file_paths, processes=None):
+        """
+        Parses deployment files in order. Files found in parse_cache are not
+        parsed, the first INLINE_PARSES others are parsed in this process and
+        the rest on a process pool started only when a tree is that large.
+        Paths are consumed as they come and results are yielded as soon as
+        all preceding ones are ready.
+        :param file_paths: iterable of deployment file paths
+        :param processes: size of the process pool, cpu count by default
+        :return: generator of (order, Deployment)
+        """
+        import multiprocessing
+        from collections import deque
+
+        processes = processes or multiprocessing.cpu_count()
+        cache = self.parse_cache
+        pending = deque()
+        pool = None
+        inline_parses = 0
+
+        def resolve(file_path, result, async_result):
+            if async_result is None:
+                return result
+            entry = async_result.get()
+            if cache is not None:
+                cache.put(file_path, entry)
+            return from_entry(entry)
+
+        try:
+            for file_path in file_paths:
+                file_path = os.path.abspath(file_path)
+                entry = cache.get(file_path) if cache is not None else None
+                if entry is not None:
+                    pending.append((file_path, from_entry(entry), None))
+                elif pool is None and (processes <= 1 or inline_parses < self.INLINE_PARSES):
+                    inline_parses += 1
+                    key = stat_key(file_path) if cache is not None else None
+                    order, deployment = self.parse_deployment(file_path)
+                    if cache is not None:
+                        cache.put(file_path, to_entry(file_path, key, order, deployment))
+                    pending.append((file_path, (order, deployment), None))
+                else:
+                    if pool is None:
+                        pool = multiprocessing.Pool(processes)
+                    pending.append((file_path, None, pool.apply_async(parse_entry, (file_path,))))
+                while pending and (pending[0][2] is None or pending[0][2].ready()):
+                    yield resolve(*pending.popleft())
+            while pending:
+                yield resolve(*pending.popleft())
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
     @staticmethod
     def __safe_get_order(deployment_file_path):
         try:
@@ -189,82 +296,138 @@ class MistApp(object):
         return update_fn(item)
 
     def __upload_artifact(self, artifact):
-        with open(artifact.file_path, 'rb') as fn_file:
-            url = 'http://{}:{}/v2/api/artifacts'.format(self.host, self.port)
-            artifact_filename = artifact.artifact_key
-            files = {'file': (artifact_filename, fn_file)}
-            resp = requests.post(url, files=files, params={'force': not self.validate})
+        artifact_filename = artifact.artifact_key
+        local_sha = self.hashes.sha1(artifact.file_path)
+        if same_sha1(self._remote_sha1(artifact_filename), local_sha):
+            # identical file is already stored under this key
+            return Artifact(artifact.name, artifact_filename)
+
+        progress = UploadProgress(artifact_filename)
+        with MultipartFileEncoder('file', artifact_filename, artifact.file_path, progress=progress) as body:
+            resp = self._request(
+                'post', 'artifacts',
+                data=body, headers={'Content-Type': body.content_type}, params={'force': not self.validate}
+            )
             if resp.status_code == 409:
                 raise FileExistsException(artifact_filename)
             resp.raise_for_status()
             job_path = resp.text
+            if self.remote_state is not None:
+                self.remote_state.add_artifact(artifact_filename, local_sha)
             return Artifact(artifact.name, job_path)
 
     def update_function(self, fn):
-        url = 'http://{}:{}/v2/api/functions'.format(self.host, self.port)
         data = fn.to_json()
-        method = 'post' if self.get_function_json(fn.name) is None else 'put'
-        resp = requests.request(method, url, json=data, params={'force': not self.validate})
+        method = 'put' if self._function_exists(fn.name) else 'post'
+        resp = self._request(method, 'functions', json=data, params={'force': not self.validate})
         resp.raise_for_status()
-        return Function.from_json(resp.json())
+        result = Function.from_json(resp.json())
+        if self.remote_state is not None:
+            self.remote_state.add_function(result)
+        return result
 
     def update_context(self, context):
-        url = 'http://{}:{}/v2/api/contexts'.format(self.host, self.port)
         data = context.to_json()
-        resp = requests.post(url, json=data)
+        resp = self._request('post', 'contexts', json=data)
         resp.raise_for_status()
-        return Context.from_json(resp.json())
+        result = Context.from_json(resp.json())
+        if self.remote_state is not None:
+            self.remote_state.add_context(result)
+        return result
 
     def workers(self):
-        url = 'http://{}:{}/v2/api/workers'.format(self.host, self.port)
-        resp = requests.get(url)
+        resp = self._request('get', 'workers')
         return list(map(Worker.from_json, resp.json()))
 
     def functions(self):
-        url = 'http://{}:{}/v2/api/functions'.format(self.host, self.port)
-        resp = requests.get(url)
+        resp = self._request('get', 'functions')
         return list(map(Function.from_json, resp.json()))
 
-    def jobs(self, status_filter):
+    def jobs(self, status_filter, limit=None, offset=0):
+        return list(self.iter_jobs(status_filter, limit, offset))
+
+    def iter_jobs(self, status_filter, limit=None, offset=0, page_size=100, function=None):
+        """
+        Pages through jobs with limit/offset, so only one page is parsed and held at a time.
+        :param status_filter: comma separated statuses
+        :param limit: max number of jobs, all by default
+        :param offset: number of jobs to skip
+        :param page_size: number of jobs requested at once
+        :param function: list only jobs of this function
+        :return: generator of Job
+        """
         filters = list(map(lambda s: s.strip(), status_filter.split(',')))
-        url = 'http://{}:{}/v2/api/jobs'.format(self.host, self.port)
-        resp = requests.get(url, params={'status': filters})
-        return list(map(Job.from_json, resp.json()))
+        path, args = ('functions/{}/jobs', [function]) if function is not None else ('jobs', [])
+        remaining = limit
+        first_ids = None
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            params = {'status': filters, 'limit': size, 'offset': offset}
+            resp = self._request('get', path, *args, params=params)
+            page = resp.json()
+            ids = [item.get('jobId') for item in page]
+            if first_ids is None:
+                first_ids = ids
+            elif ids == first_ids:
+                # server ignored offset and returned the first page again
+                return
+            # server without pagination support returns everything at once
+            unpaged = len(page) > size
+            if unpaged:
+                page = page[:remaining]
+            for item in page:
+                yield Job.from_json(item)
+            if unpaged or len(page) < size:
+                return
+            offset += size
+            if remaining is not None:
+                remaining -= size
 
     def contexts(self):
-        url = 'http://{}:{}/v2/api/contexts'.format(self.host, self.port)
-        resp = requests.get(url)
+        resp = self._request('get', 'contexts')
         return list(map(Context.from_json, resp.json()))
 
     def cancel_job(self, job_id):
-        url = 'http://{}:{}/v2/api/jobs/{}'.format(self.host, self.port, quote(job_id, safe=''))
-        resp = requests.delete(url)
+        resp = self._request('delete', 'jobs/{}', job_id)
         resp.raise_for_status()
 
     def kill_worker(self, worker_id):
-        url = 'http://{}:{}/v2/api/workers/{}'.format(self.host, self.port, quote(worker_id, safe=''))
-        resp = requests.delete(url)
+        resp = self._request('delete', 'workers/{}', worker_id)
         resp.raise_for_status()
 
     def start_job(self, function, req):
         if isinstance(req, str):
             req = json.loads(req)
 
-        url = 'http://{}:{}/v2/api/functions/{}/jobs?force=true'.format(self.host, self.port, quote(function, safe=''))
-        resp = requests.post(url, json=req)
+        resp = self._request('post', 'functions/{}/jobs', function, json=req, params={'force': 'true'})
+        resp.raise_for_status()
+        return resp.json()
+
+    def submit_job(self, function, req):
+        """
+        Starts job without waiting for its result.
+        :return: job id
+        """
+        if isinstance(req, str):
+            req = json.loads(req)
+
+        resp = self._request('post', 'functions/{}/jobs', function, json=req)
+        resp.raise_for_status()
+        return resp.json()['id']
+
+    def get_job(self, job_id):
+        resp = self._request('get', 'jobs/{}', job_id)
         resp.raise_for_status()
         return resp.json()
 
     def get_sha1(self, artifact_name):
-        url = 'http://{}:{}/v2/api/artifacts/{}/sha'.format(self.host, self.port, quote(artifact_name, safe=''))
-        resp = requests.get(url)
+        resp = self._request('get', 'artifacts/{}/sha', artifact_name)
         if resp.status_code == 200:
             return resp.text
         return None
 
     def get_context(self, context_name):
-        url = 'http://{}:{}/v2/api/contexts/{}'.format(self.host, self.port, quote(context_name, safe=''))
-        resp = requests.get(url)
+        resp = self._request('get', 'contexts/{}', context_name)
         if resp.status_code == 200:
             return Context.from_json(resp.json())
         return None
@@ -276,36 +439,95 @@ class MistApp(object):
         return None
 
     def get_function_json(self, fn_name):
-        url = 'http://{}:{}/v2/api/functions/{}'.format(self.host, self.port, quote(fn_name, safe=''))
-        resp = requests.get(url)
+        resp = self._request('get', 'functions/{}', fn_name)
         if resp.status_code == 200:
             return resp.json()
         return None
 
     def update_deployments(self, deployments):
-        with_errors = False
-        for depl in deployments:
-            try:
-                self.update(depl)
-                click.echo('Success: {} {}'.format(depl.model_type, depl.get_name()))
-            except requests.exceptions.HTTPError as e:
-                with_errors = True
-                msg = format_request_error(e)
-                click.echo(msg)
+        """
+        Applies up to self.parallelism deployments at the same time, function entries
+        start only after their context and artifact from the same batch succeeded.
+        Entries unchanged since the last apply recorded in self.apply_state are skipped.
+        :type deployments: list of Deployment
+        :param deployments:
+        :return: True if any entry failed
+        """
+        import requests
 
-            except Exception as e:
+        with_errors = False
+        artifact_files = [d.data.get('file-path', None) for d in deployments if d.model_type == 'Artifact']
+        self.hashes.sha1_many(p for p in artifact_files if p is not None and os.path.isfile(p))
+        digests = [None] * len(deployments)
+        if self.apply_state is not None:
+            changed = []
+            for depl in deployments:
+                digest = deployment_digest(depl, self.hashes.sha1)
+                if self.apply_state.is_applied(depl, digest):
+                    click.echo('Unchanged: {} {}'.format(depl.model_type, depl.get_name()))
+                else:
+                    changed.append((depl, digest))
+            deployments = [depl for depl, _ in changed]
+            digests = [digest for _, digest in changed]
+
+        executor = DependencyExecutor(self.parallelism)
+        self.remote_state = RemoteState(self)
+        try:
+            dependencies = deployment_dependencies(deployments)
+            results = executor.run(dependencies, lambda i: self.update(deployments[i]))
+            for i, e in results:
+                depl = deployments[i]
+                if e is None:
+                    if self.apply_state is not None:
+                        self.apply_state.mark_applied(depl, digests[i])
+                    click.echo('Success: {} {}'.format(depl.model_type, depl.get_name()))
+                    continue
                 with_errors = True
-                click.echo('Error: ' + str(e))
+                if isinstance(e, requests.exceptions.HTTPError):
+                    click.echo(format_request_error(e))
+                elif isinstance(e, DependencyFailedException):
+                    dep = deployments[e.dependency]
+                    click.echo('Error: {} {} skipped, {} {} failed'.format(
+                        depl.model_type, depl.get_name(), dep.model_type, dep.get_name()
+                    ))
+                else:
+                    click.echo('Error: ' + str(e))
+        except ValueError as e:
+            with_errors = True
+            click.echo('Error: ' + str(e))
+        finally:
+            self.remote_state = None
+            self.hashes.save()
+            if self.apply_state is not None:
+                self.apply_state.save()
         return with_errors
 
+    def _function_exists(self, fn_name):
+        if self.remote_state is not None:
+            return self.remote_state.has_function(fn_name)
+        return self.get_function_json(fn_name) is not None
+
+    def _context_exists(self, context_name):
+        if self.remote_state is not None:
+            return self.remote_state.has_context(context_name)
+        return self.get_context(context_name) is not None
+
+    def _remote_sha1(self, artifact_key):
+        if self.remote_state is not None:
+            return self.remote_state.artifact_sha(artifact_key)
+        return self.get_sha1(artifact_key)
+
     def _validate_artifact(self, a):
         """
         :type a: Artifact
         :param a:
         :return:
         """
-        remote_file_sha = self.get_sha1(a.artifact_key)
-        if remote_file_sha is not None:
+        remote_file_sha = self._remote_sha1(a.artifact_key)
+        if remote_file_sha is None:
+            return
+        local_file_sha = self.hashes.sha1(a.file_path) if os.path.isfile(a.file_path) else None
+        if not same_sha1(remote_file_sha, local_file_sha):
             raise ValueError("Artifact key {} has to be unique".format(a.artifact_key))
 
     def _validate_context(self, c):
@@ -317,22 +539,18 @@ class MistApp(object):
         :param e:
         :return:
         """
-        remote_ctx = self.get_context(e.default_context.name)
-        artifact_sha = self.get_sha1(e.path)
-
         message_tmpl = "{} {} is not valid. Please check: {}"
 
-        if remote_ctx is None:
+        if not self._context_exists(e.default_context.name):
             msg = 'Context {} should exists remotely'.format(e.default_context.name)
             raise ValueError(message_tmpl.format('Function', e.name, msg))
 
-        if artifact_sha is None:
+        if self._remote_sha1(e.path) is None:
             msg = 'Artifact {} should exists remotely'.format(e.path)
             raise ValueError(message_tmpl.format('Function', e.name, msg))
 
     def get_status(self):
-        url = 'http://{}:{}/v2/api/status'.format(self.host, self.port)
-        resp = requests.get(url)
+        resp = self._request('get', 'status')
         if resp.status_code == 200:
             return resp.json()
         return dict()
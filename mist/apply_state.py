@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+
+
+def deployment_digest(deployment, file_sha1):
+    """
+    :type deployment: mist.models.Deployment
+    :param deployment:
+    :param file_sha1: function returning sha1 of a local file
+    :return: hash of everything that is sent to mist for the deployment
+    :rtype: str
+    """
+    data = deployment.data
+    if hasattr(data, 'as_plain_ordered_dict'):
+        data = data.as_plain_ordered_dict()
+    artifact_sha = None
+    if deployment.model_type == 'Artifact':
+        file_path = deployment.data.get('file-path', None)
+        if file_path is None or not os.path.isfile(file_path):
+            return None
+        artifact_sha = file_sha1(file_path)
+    payload = json.dumps(
+        [deployment.name, deployment.model_type, data, deployment.version, artifact_sha],
+        sort_keys=True, default=str
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ApplyState(object):
+    """
+    Hashes of deployments successfully applied to a mist server, persisted
+    in a json file shared between servers: {server: {entry: hash}}.
+    """
+
+    def __init__(self, path, server, force=False):
+        """
+        :param path: state file path
+        :param server: mist address the state belongs to
+        :param force: treat every deployment as changed
+        """
+        self.path = path
+        self.server = server
+        self.force = force
+        self.entries = dict()
+
+    @staticmethod
+    def entry_key(deployment):
+        return '{}:{}'.format(deployment.model_type, deployment.get_name())
+
+    def load(self):
+        self.entries = self._read().get(self.server, dict())
+        return self
+
+    def _read(self):
+        if not os.path.isfile(self.path):
+            return dict()
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except ValueError:
+            return dict()
+
+    def is_applied(self, deployment, digest):
+        if self.force or digest is None:
+            return False
+        return self.entries.get(self.entry_key(deployment)) == digest
+
+    def mark_applied(self, deployment, digest):
+        if digest is not None:
+            self.entries[self.entry_key(deployment)] = digest
+
+    def save(self):
+        state = self._read()
+        state[self.server] = self.entries
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.rename(tmp_path, self.path)
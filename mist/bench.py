@@ -0,0 +1,124 @@
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from mist.trace import percentile
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class LoadGenerator(object):
+    """
+    Drives concurrent submitters until the job count is reached or the
+    duration passes. Each submitter sends its next request as soon as the
+    previous one completed, so the load is bounded by concurrency.
+    """
+
+    def __init__(self, call, requests, concurrency=4, duration=None, jobs=None):
+        """
+        :param call: function sending one request, raises or returns a falsy value on failure
+        :param requests: iterator of request bodies, shared by submitters
+        :param concurrency: number of submitters
+        :param duration: seconds to run
+        :param jobs: number of requests to send
+        """
+        if duration is None and jobs is None:
+            raise ValueError('Either duration or number of jobs is required')
+        self.call = call
+        self.requests = requests
+        self.concurrency = concurrency
+        self.duration = duration
+        self.jobs = jobs
+        self.latencies = []
+        self.errors = OrderedDict()
+        self._lock = threading.Lock()
+        self._sent = 0
+
+    def _next_request(self, deadline):
+        with self._lock:
+            if self.jobs is not None and self._sent >= self.jobs:
+                return None
+            if deadline is not None and time.time() >= deadline:
+                return None
+            self._sent += 1
+            return next(self.requests)
+
+    def _submitter(self, deadline):
+        while True:
+            req = self._next_request(deadline)
+            if req is None:
+                return
+            started = time.time()
+            error = None
+            try:
+                if not self.call(req):
+                    error = 'job failed'
+            except Exception as e:
+                error = type(e).__name__
+            latency = time.time() - started
+            with self._lock:
+                self.latencies.append(latency)
+                if error is not None:
+                    self.errors[error] = self.errors.get(error, 0) + 1
+
+    def run(self):
+        """
+        :return: report
+        :rtype: collections.OrderedDict
+        """
+        started = time.time()
+        deadline = started + self.duration if self.duration is not None else None
+        threads = [threading.Thread(target=self._submitter, args=(deadline,)) for _ in range(self.concurrency)]
+        for t in threads:
+            t.daemon = True
+            t.start()
+        for t in threads:
+            t.join()
+        return self.report(time.time() - started)
+
+    def report(self, elapsed):
+        latencies = sorted(self.latencies)
+        errors = sum(self.errors.values())
+        report = OrderedDict([
+            ('concurrency', self.concurrency),
+            ('jobs', len(latencies)),
+            ('errors', errors),
+            ('error_rate', round(float(errors) / len(latencies), 4) if latencies else 0.0),
+            ('duration_s', round(elapsed, 3)),
+            ('jobs_per_sec', round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0),
+        ])
+        for p in PERCENTILES:
+            value = percentile(latencies, p)
+            report['p{}_ms'.format(p)] = round(value * 1000, 3) if value is not None else None
+        report['max_ms'] = round(latencies[-1] * 1000, 3) if latencies else None
+        report['error_types'] = self.errors
+        return report
+
+
+def cycle_lines(lines):
+    """
+    :param lines: json lines
+    :return: endless iterator over requests of non blank lines
+    """
+    requests = [json.loads(line) for line in lines if line.strip()]
+    if not requests:
+        raise ValueError('No requests in file')
+    return itertools.cycle(requests)
+
+
+def compare_rows(report, baseline):
+    """
+    :return: rows of metric, value, baseline value and relative change for numeric metrics
+    """
+    rows = []
+    for key, value in report.items():
+        if key == 'error_types':
+            continue
+        base = baseline.get(key)
+        change = ''
+        if isinstance(value, (int, float)) and isinstance(base, (int, float)) and base:
+            change = '{:+.1f}%'.format((value - base) * 100.0 / base)
+        rows.append([key, value, base if base is not None else '-', change])
+    return rows
@@ -1,17 +1,27 @@
-import fnmatch
 import json
-import math
 import os
-import random
+import re
+import sys
 from functools import update_wrapper
 
 import click
-import requests
 from click.globals import get_current_context
-from texttable import Texttable
 
 from mist import app, format_request_error
+from mist.apply_state import ApplyState
+from mist.bench import LoadGenerator, compare_rows, cycle_lines
+from mist.completion import completion_kwargs
+from mist.discovery import GitException, IgnoreRules, changed_files, find_files
+from mist.hashing import HashCache
+from mist.jobs import JobWaiter, WaitTimeoutException, cancel_jobs, job_result, submit_jobs
+from mist.response_cache import ResponseCache
+from mist.watch import Watcher
+from mist.workers import BusyWorkers, WorkerFilter, kill_workers
+from mist.trace import Tracer
 from mist.models import Worker, Job, Function, Context, Deployment
+from mist.output import output_option, write_rows
+from mist.parse_cache import ParseCache
+from mist.query import SORT_KEYS, JobQuery, parse_time, query_jobs
 from mist.__version__ import __version__ as cli_version
 
 CONTEXT_SETTINGS = dict(auto_envvar_prefix='MIST')
@@ -60,11 +70,17 @@ class GroupWithGroupSubCommand(click.Group):
     def invoke(self, ctx):
         try:
             return super(GroupWithGroupSubCommand, self).invoke(ctx)
-        except requests.exceptions.HTTPError as e:
-            msg = format_request_error(e)
-            raise click.UsageError(msg)
-        except requests.exceptions.RequestException as e:
-            raise click.UsageError(str(e))
+        except Exception as e:
+            # requests is imported lazily, an error of it can only be raised once it is loaded
+            requests = sys.modules.get('requests')
+            if requests is None:
+                raise
+            if isinstance(e, requests.exceptions.HTTPError):
+                msg = format_request_error(e)
+                raise click.UsageError(msg)
+            if isinstance(e, requests.exceptions.RequestException):
+                raise click.UsageError(str(e))
+            raise
 
 
 def pass_ctx_and_custom_obj_decorator(object_type, ensure=False):
@@ -90,6 +106,12 @@ pass_mist_app = pass_ctx_and_custom_obj_decorator(app.MistApp, ensure=True)
 
 
 def draw_table(ctx, mist_app, items, header):
+    click.echo(render_table(mist_app, items, header))
+
+
+def render_table(mist_app, items, header):
+    from texttable import Texttable
+
     items = list(items)
     table = Texttable()
     table.set_cols_align(list(map(lambda _: 'l', header)))
@@ -97,22 +119,75 @@ def draw_table(ctx, mist_app, items, header):
     if mist_app.format_table:
         table.set_deco(Texttable.BORDER | Texttable.HEADER | Texttable.HLINES | Texttable.VLINES)
     table.add_rows([header] + items)
-    click.echo(table.draw())
+    return table.draw()
 
 
 __list_choices = {
     Worker: lambda mist_app, *args: mist_app.workers(),
-    Job: lambda mist_app, *args: mist_app.jobs(*args),
+    Job: lambda mist_app, *args: query_jobs(mist_app, *args),
     Function: lambda mist_app, *args: mist_app.functions(),
     Context: lambda mist_app, *args: mist_app.contexts()
 }
 
 
-def list_items(ctx, mist_app, item_type, *args):
+def list_items(ctx, mist_app, item_type, output, *args):
     items = __list_choices.get(item_type, lambda _: [])
-    rows = list(map(item_type.to_row, items(mist_app, *args)))
-    header = item_type.header
-    draw_table(ctx, mist_app, rows, header)
+    rows = map(item_type.to_row, items(mist_app, *args))
+    write_rows(rows, item_type.header, output, mist_app.format_table)
+
+
+def watch_items(ctx, mist_app, item_type, interval, output, *args):
+    if output != 'table':
+        raise click.UsageError('--watch supports only table output')
+    items = __list_choices.get(item_type, lambda _: [])
+    watcher = Watcher(
+        lambda: list(map(item_type.to_row, items(mist_app, *args))),
+        lambda rows: render_table(mist_app, rows, item_type.header),
+        interval
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+
+def watch_options(f):
+    f = click.option('--interval',
+                     type=click.FloatRange(0.1, None),
+                     default=2.0,
+                     show_default=True,
+                     help='Base polling interval in seconds of --watch, '
+                          'it grows while nothing changes')(f)
+    return click.option('-w', '--watch', is_flag=True, help='Poll and redraw changed rows until interrupted')(f)
+
+
+def time_callback(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return parse_time(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def job_filter_options(default_status):
+    """
+    Options selecting jobs by status, function, context, source and start time,
+    shared by commands working on many jobs.
+    :param default_status: comma separated job statuses used without --filter
+    """
+    def decorator(f):
+        f = click.option('--until', callback=time_callback,
+                         help='Jobs started before local time or time ago, e.g. 30m')(f)
+        f = click.option('--since', callback=time_callback,
+                         help='Jobs started after local time or time ago, e.g. 2h, 1d')(f)
+        f = click.option('--source', help='Job source or glob pattern, e.g. http, cli')(f)
+        f = click.option('--context', help='Context name or glob pattern')(f)
+        f = click.option('--function', help='Function name or glob pattern, e.g. spark-*')(f)
+        return click.option('--filter', default=default_status, show_default=True,
+                            help='Comma separated job statuses')(f)
+
+    return decorator
 
 
 @click.group(context_settings=CONTEXT_SETTINGS, help="""
@@ -132,10 +207,48 @@ def list_items(ctx, mist_app, item_type, *args):
               required=False)
 @click.option('-y', '--yes', is_flag=True, help='Say \'Yes\' to all confirmations')
 @click.option('-f', '--format-table', is_flag=True, help='Format table')
+@click.option('--pool-size',
+              default=10,
+              show_default=True,
+              help='Max number of kept-alive connections to mist')
+@click.option('--timeout',
+              type=float,
+              default=None,
+              help='Timeout in seconds for a single request to mist')
+@click.option('--retries',
+              type=click.IntRange(0, None),
+              default=3,
+              show_default=True,
+              help='Max retries of a request failed with a transient error')
+@click.option('--retry-backoff',
+              type=float,
+              default=0.5,
+              show_default=True,
+              help='Base delay in seconds of exponential backoff between retries')
+@click.option('--trace', is_flag=True, help='Print latency summary of requests to mist on exit')
+@click.option('--trace-file',
+              type=click.Path(dir_okay=False, writable=True),
+              help='Write every request to mist as a json line to this file')
+@click.option('--cache-dir',
+              default=lambda: click.get_app_dir('mist-cli'),
+              help='Directory for local caches and state. Can be set with MIST_CACHE_DIR environment variable')
+@click.option('--cache/--no-cache',
+              default=False,
+              help='Serve list of functions, contexts and workers from a short-lived response cache in --cache-dir. '
+                   'Can be enabled with MIST_CACHE=1 environment variable')
 @click.version_option(version=cli_version)
 @pass_mist_app
-def mist_cli(ctx, mist_app, host, port, yes, format_table):  # pragma: no cover
+def mist_cli(ctx, mist_app, host, port, yes, format_table, pool_size, timeout, retries, retry_backoff,
+             trace, trace_file, cache_dir, cache):  # pragma: no cover
     """
+    :param cache:
+    :param trace_file:
+    :param trace:
+    :param retry_backoff:
+    :param retries:
+    :param cache_dir:
+    :param timeout:
+    :param pool_size:
     :param format_table:
     :param yes:
     :type mist_app MistApp
@@ -149,9 +262,45 @@ def mist_cli(ctx, mist_app, host, port, yes, format_table):  # pragma: no cover
     mist_app.port = port
     mist_app.accept_all = yes
     mist_app.format_table = format_table
+    mist_app.cache_dir = cache_dir
+    mist_app.hashes = HashCache(os.path.join(cache_dir, 'sha1-cache.json')).load()
+    ctx.call_on_close(mist_app.hashes.save)
+    mist_app.transport_options = dict(
+        pool_size=pool_size, timeout=timeout, retries=retries, retry_backoff=retry_backoff
+    )
+    if cache:
+        mist_app.transport_options['cache'] = ResponseCache(os.path.join(cache_dir, 'responses'))
+    ctx.call_on_close(mist_app.close)
+    if trace or trace_file:
+        tracer = Tracer(open(trace_file, 'w') if trace_file else None)
+        mist_app.transport_options['tracer'] = tracer
+        ctx.call_on_close(lambda: finish_trace(mist_app, tracer, trace))
+
+
+def finish_trace(mist_app, tracer, print_summary):
+    """
+    :type mist_app: mist.app.MistApp
+    :type tracer: Tracer
+    :param print_summary: print per endpoint summary to stderr
+    """
+    from texttable import Texttable
+
+    if tracer.jsonl_file is not None:
+        tracer.jsonl_file.close()
+    if print_summary:
+        table = Texttable()
+        table.set_cols_align(list(map(lambda _: 'l', Tracer.header)))
+        table.set_cols_dtype(list(map(lambda _: 't', Tracer.header)))
+        table.set_deco(Texttable.HEADER)
+        if mist_app.format_table:
+            table.set_deco(Texttable.BORDER | Texttable.HEADER | Texttable.HLINES | Texttable.VLINES)
+        table.add_rows([Tracer.header] + tracer.summary_rows())
+        click.echo(table.draw(), err=True)
 
 
 def get_mist_versions(mist_app):
+    import requests
+
     try:
         mist_status = mist_app.get_status()
         mist_ver = mist_status.get('mistVersion', 'UNKNOWN')
@@ -183,7 +332,7 @@ def kill():  # pragma: no cover
 
 
 @kill.command('worker', help='Kill worker by id')
-@click.argument('worker_id')
+@click.argument('worker_id', **completion_kwargs('workers'))
 @pass_mist_app
 def kill_worker(ctx, mist_app, worker_id):
     if not mist_app.accept_all:
@@ -193,9 +342,11 @@ def kill_worker(ctx, mist_app, worker_id):
 
 
 @kill.command('job', help='Cancel job by id or external id')
-@click.argument('job_id')
+@click.argument('job_id', **completion_kwargs('jobs'))
 @pass_mist_app
 def kill_job(ctx, mist_app, job_id):
+    from texttable import Texttable
+
     if not mist_app.accept_all:
         click.confirm('Are you sure you want to cancel job {}?'.format(job_id), abort=True, err=True)
     click.echo('Killing job {}'.format(job_id))
@@ -211,37 +362,161 @@ def kill_job(ctx, mist_app, job_id):
     click.echo(table.draw())
 
 
+@kill.command('jobs', help='Cancel all jobs matching filters, asks for confirmation once')
+@job_filter_options('queued')
+@click.option('--parallelism',
+              type=click.IntRange(1, None),
+              default=8,
+              show_default=True,
+              help='Max number of concurrent cancel requests')
+@pass_mist_app
+def kill_jobs(ctx, mist_app, filter, function, context, source, since, until, parallelism):
+    # the connection pool is sized when the session is created by the first request
+    mist_app.transport.pool_size = max(mist_app.transport.pool_size, parallelism)
+    query = JobQuery(function, context, source, since, until)
+    job_ids = [job.job_id for job in query_jobs(mist_app, filter, query)]
+    if not job_ids:
+        click.echo('No jobs to cancel', err=True)
+        return
+    if not mist_app.accept_all:
+        click.confirm('Are you sure you want to cancel {} jobs?'.format(len(job_ids)), abort=True, err=True)
+
+    report_bulk(ctx, cancel_jobs(mist_app, job_ids, parallelism), len(job_ids), 'Cancelling jobs', 'cancel job',
+                'Cancelled {} jobs, {} failed')
+
+
+@kill.command('workers',
+              help='Stop all workers matching filters, asks for confirmation once. '
+                   'PATTERNS are matched against worker name and address, e.g. \'spark-ctx*\' or \'*:2551*\'')
+@click.argument('patterns', nargs=-1)
+@click.option('--regex', is_flag=True, help='Patterns are regular expressions instead of globs')
+@click.option('--context', help='Only workers of the context')
+@click.option('--idle', is_flag=True, help='Only workers running no started jobs')
+@click.option('--dry-run', is_flag=True, help='Print workers that would be stopped and exit')
+@click.option('--parallelism',
+              type=click.IntRange(1, None),
+              default=8,
+              show_default=True,
+              help='Max number of concurrent stop requests')
+@pass_mist_app
+def kill_workers_cmd(ctx, mist_app, patterns, regex, context, idle, dry_run, parallelism):
+    if not (patterns or context or idle):
+        raise click.UsageError('Select workers with PATTERNS, --context or --idle')
+    # the connection pool is sized when the session is created by the first request
+    mist_app.transport.pool_size = max(mist_app.transport.pool_size, parallelism)
+    try:
+        busy = BusyWorkers(mist_app.iter_jobs('started')) if idle else None
+        worker_filter = WorkerFilter(patterns, regex, context, busy)
+    except re.error as e:
+        raise click.BadParameter(str(e), param_hint='PATTERNS')
+    workers = worker_filter.apply(mist_app.workers())
+    if dry_run:
+        draw_table(ctx, mist_app, map(Worker.to_row, workers), Worker.header)
+        click.echo('Would stop {} workers'.format(len(workers)), err=True)
+        return
+    if not workers:
+        click.echo('No workers to stop', err=True)
+        return
+    if not mist_app.accept_all:
+        click.confirm('Are you sure you want to stop {} workers?'.format(len(workers)), abort=True, err=True)
+
+    names = [w.name for w in workers]
+    report_bulk(ctx, kill_workers(mist_app, names, parallelism), len(names), 'Stopping workers', 'stop worker',
+                'Stopped {} workers, {} failed')
+
+
+def report_bulk(ctx, results, total, label, action, summary):
+    """
+    Shows progress of concurrent requests, then failures and a summary. Exits with 1 if any request failed.
+    :param results: iterable of (id, error message or None)
+    :param total: number of results
+    :param action: failed action, e.g. 'cancel job'
+    :param summary: format of succeeded and failed counts
+    """
+    failed = []
+    with click.progressbar(length=total, label=label, file=sys.stderr) as bar:
+        for item_id, error in results:
+            if error is not None:
+                failed.append((item_id, error))
+            bar.update(1)
+
+    for item_id, error in failed:
+        click.echo('Failed to {} {}: {}'.format(action, item_id, error), err=True)
+    click.echo(summary.format(total - len(failed), len(failed)), err=True)
+    if failed:
+        ctx.exit(1)
+
+
 @mist_cli.group('list')
 def list_cmd():  # pragma: no cover
     pass
 
 
 @list_cmd.command('workers', help='List workers')
+@watch_options
+@output_option
 @pass_mist_app
-def list_workers(ctx, mist_app):
-    list_items(ctx, mist_app, Worker)
+def list_workers(ctx, mist_app, watch, interval, output):
+    if watch:
+        watch_items(ctx, mist_app, Worker, interval, output)
+    else:
+        list_items(ctx, mist_app, Worker, output)
 
 
 @list_cmd.command('jobs', help='List jobs')
-@click.option('--filter',
-              required=False,
-              default='started',
-              help='Comma separated job statuses')
+@job_filter_options('started')
+@click.option('--sort',
+              type=click.Choice(SORT_KEYS + tuple('-' + key for key in SORT_KEYS)),
+              help='Sort jobs by column, prefix with - for descending order')
+@click.option('--limit', type=click.IntRange(1, None), help='Max number of jobs to list, all by default')
+@click.option('--offset', type=click.IntRange(0, None), default=0, help='Number of jobs to skip on the server')
+@click.option('--page-size',
+              type=click.IntRange(1, None),
+              default=100,
+              show_default=True,
+              help='Number of jobs fetched per request, rows are printed page by page')
+@watch_options
+@output_option
 @pass_mist_app
-def list_jobs(ctx, mist_app, filter):
-    list_items(ctx, mist_app, Job, filter)
+def list_jobs(ctx, mist_app, filter, function, context, source, since, until, sort, limit, offset, page_size,
+              watch, interval, output):
+    query = JobQuery(function, context, source, since, until, sort, limit)
+    if watch:
+        watch_items(ctx, mist_app, Job, interval, output, filter, query, offset, page_size)
+    else:
+        list_items(ctx, mist_app, Job, output, filter, query, offset, page_size)
 
 
 @list_cmd.command('functions', help='List all functions')
+@watch_options
+@output_option
 @pass_mist_app
-def list_functions(ctx, mist_app):
-    list_items(ctx, mist_app, Function)
+def list_functions(ctx, mist_app, watch, interval, output):
+    if watch:
+        watch_items(ctx, mist_app, Function, interval, output)
+    else:
+        list_items(ctx, mist_app, Function, output)
 
 
 @list_cmd.command('contexts', help='List all contexts')
+@watch_options
+@output_option
 @pass_mist_app
-def list_contexts(ctx, mist_app):
-    list_items(ctx, mist_app, Context)
+def list_contexts(ctx, mist_app, watch, interval, output):
+    if watch:
+        watch_items(ctx, mist_app, Context, interval, output)
+    else:
+        list_items(ctx, mist_app, Context, output)
+
+
+def poll_options(f):
+    f = click.option('--wait-timeout', type=float, default=None,
+                     help='Max seconds to wait for jobs, forever by default')(f)
+    f = click.option('--max-poll-interval', type=float, default=10.0, show_default=True,
+                     help='Max delay in seconds between polls of a job status')(f)
+    return click.option('--poll-interval', type=float, default=0.5, show_default=True,
+                        help='First delay in seconds between polls of a job status, '
+                             'it doubles while the status does not change')(f)
 
 
 @mist_cli.group('start')
@@ -252,11 +527,19 @@ def start():  # pragma: no cover
 @start.command('job',
                help='Start job',
                short_help='start job <function> <json request>')
-@click.argument('function', required=True, nargs=1)
+@click.argument('function', required=True, nargs=1, **completion_kwargs('functions'))
 @click.argument('request', required=False, nargs=1, default='{}')
 @click.option('--pretty', is_flag=True)
+@click.option('--async', 'no_wait', is_flag=True, help='Print job id without waiting for the result')
+@click.option('--wait', is_flag=True,
+              help='Start job asynchronously and poll its status until it completes, '
+                   'no connection is held while the job runs')
+@poll_options
 @pass_mist_app
-def start_job(ctx, mist_app, function, request, pretty):
+def start_job(ctx, mist_app, function, request, pretty, no_wait, wait, poll_interval, max_poll_interval,
+              wait_timeout):
+    import requests
+
     if request[0] == '@':
         file_path_with_json = request[1:]
         with open(file_path_with_json, 'r') as f:
@@ -266,6 +549,17 @@ def start_job(ctx, mist_app, function, request, pretty):
     if pretty:  # pragma: no cover
         kw['indent'] = 2
         kw['sort_keys'] = True
+    if no_wait or wait:
+        try:
+            job_id = mist_app.submit_job(function, request)
+        except requests.exceptions.HTTPError as e:
+            raise click.ClickException(e.response.text)
+        if no_wait:
+            click.echo(job_id)
+            return
+        click.echo('Started job {}'.format(job_id), err=True)
+        wait_jobs(ctx, mist_app, [job_id], kw, poll_interval, max_poll_interval, wait_timeout)
+        return
     try:
         job_result = json.dumps(mist_app.start_job(function, request), **kw)
     except requests.exceptions.HTTPError as e:
@@ -276,40 +570,151 @@ def start_job(ctx, mist_app, function, request, pretty):
     click.echo(job_result)
 
 
+@start.command('jobs',
+               help='Start a job of the function for every json line of the file, '
+                    'results are written as json lines in completion order',
+               short_help='start jobs <function> @<requests.jsonl>')
+@click.argument('function', required=True, nargs=1, **completion_kwargs('functions'))
+@click.argument('requests_file', metavar='@REQUESTS', required=True, nargs=1)
+@click.option('-o', '--output', type=click.File('w'), default='-', help='File for result lines, stdout by default')
+@click.option('--parallelism',
+              type=click.IntRange(1, None),
+              default=4,
+              show_default=True,
+              help='Max number of concurrent submissions')
+@click.option('--rate', type=float, default=None, help='Max submissions per second, unlimited by default')
+@pass_mist_app
+def start_jobs(ctx, mist_app, function, requests_file, output, parallelism, rate):
+    mist_app.transport.pool_size = max(mist_app.transport.pool_size, parallelism)
+    if requests_file.startswith('@'):
+        requests_file = requests_file[1:]
+    submitted = failed = 0
+    with click.open_file(requests_file, 'r') as lines:
+        for result in submit_jobs(mist_app, function, lines, parallelism, rate):
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+            if result['error'] is None:
+                submitted += 1
+            else:
+                failed += 1
+    click.echo('Submitted {} jobs, {} failed'.format(submitted, failed), err=True)
+    if failed:
+        ctx.exit(1)
+
+
+@mist_cli.group('wait')
+def wait():  # pragma: no cover
+    pass
+
+
+@wait.command('jobs', help='Wait for jobs started with --async and print their results as json lines')
+@click.argument('job_ids', nargs=-1, required=True, **completion_kwargs('jobs'))
+@poll_options
+@pass_mist_app
+def wait_jobs_cmd(ctx, mist_app, job_ids, poll_interval, max_poll_interval, wait_timeout):
+    wait_jobs(ctx, mist_app, job_ids, dict(), poll_interval, max_poll_interval, wait_timeout)
+
+
+def wait_jobs(ctx, mist_app, job_ids, dumps_kw, poll_interval, max_poll_interval, wait_timeout):
+    """
+    Prints results of jobs as they complete and exits with 1 if any of them did not finish successfully.
+    """
+    def report(job):
+        click.echo('Job {} {}'.format(job['jobId'], job['status']), err=True)
+
+    waiter = JobWaiter(mist_app, poll_interval, max_poll_interval, wait_timeout, on_change=report)
+    failed = 0
+    try:
+        for job in waiter.wait(job_ids):
+            result = job_result(job)
+            if len(job_ids) > 1:
+                result['jobId'] = job['jobId']
+            failed += 0 if result['success'] else 1
+            click.echo(json.dumps(result, **dumps_kw))
+    except WaitTimeoutException as e:
+        raise click.ClickException(str(e))
+    if failed:
+        ctx.exit(1)
+
+
+@mist_cli.command('bench', help="""
+    Load test a function: concurrent submitters start jobs and wait for their results
+    for a fixed duration or number of jobs, then throughput, error rate and latency
+    percentiles are reported.
+""", short_help='bench <function>')
+@click.argument('function', required=True, nargs=1, **completion_kwargs('functions'))
+@click.option('--requests', 'requests_file',
+              help='@file with json lines of requests used in turn, '
+                   'requests are generated from the function arguments by default')
+@click.option('-c', '--concurrency',
+              type=click.IntRange(1, None),
+              default=4,
+              show_default=True,
+              help='Number of concurrent submitters')
+@click.option('-d', '--duration', type=float, help='Seconds to run')
+@click.option('-n', '--jobs', type=click.IntRange(1, None), help='Number of jobs to run, 100 if --duration is not set')
+@click.option('--seed', type=int, help='Seed of generated requests, runs with the same seed send the same requests')
+@click.option('--min-size', type=click.IntRange(0, None), default=1, show_default=True,
+              help='Min number of elements of generated lists and maps')
+@click.option('--max-size', type=click.IntRange(0, None), default=1, show_default=True,
+              help='Max number of elements of generated lists and maps')
+@click.option('--report', type=click.File('w'), help='Write report as json to this file')
+@click.option('--baseline', type=click.File('r'), help='Compare with a json report of a previous run')
+@pass_mist_app
+def bench(ctx, mist_app, function, requests_file, concurrency, duration, jobs, seed, min_size, max_size, report,
+          baseline):
+    from mist.generator import RequestGenerator
+
+    if min_size > max_size:
+        raise click.BadParameter('must not be greater than --max-size', param_hint='--min-size')
+    # the connection pool is sized when the session is created by the first request
+    mist_app.transport.pool_size = max(mist_app.transport.pool_size, concurrency)
+    function_json = mist_app.get_function_json(function)
+    if function_json is None:
+        raise click.ClickException('Function {} not found'.format(function))
+    if duration is None and jobs is None:
+        jobs = 100
+    if requests_file is not None:
+        with click.open_file(requests_file.lstrip('@'), 'r') as f:
+            requests = cycle_lines(f)
+    else:
+        requests = iter(RequestGenerator(function_json.get('execute', dict()), seed=seed,
+                                         min_size=min_size, max_size=max_size))
+
+    limit = '{} jobs'.format(jobs) if duration is None else '{}s'.format(duration)
+    click.echo('Running {} of {} with concurrency {}'.format(limit, function, concurrency), err=True)
+    generator = LoadGenerator(
+        lambda req: mist_app.start_job(function, req).get('success', False),
+        requests, concurrency, duration, jobs
+    )
+    result = generator.run()
+
+    if report is not None:
+        json.dump(result, report, indent=2)
+    if baseline is not None:
+        rows = compare_rows(result, json.load(baseline))
+        draw_table(ctx, mist_app, rows, ['METRIC', 'VALUE', 'BASELINE', 'CHANGE'])
+    else:
+        rows = [[key, value] for key, value in result.items() if key != 'error_types']
+        draw_table(ctx, mist_app, rows, ['METRIC', 'VALUE'])
+    for error, count in result['error_types'].items():
+        click.echo('{}: {}'.format(error, count), err=True)
+
+
 def generate_request(function_json):
     """
     :param function_json:
     :return:
     """
-    generated_obj = {}
-    execute_instance = function_json.get('execute', dict())
-    for key in execute_instance.keys():
-        generated_obj[key] = generate_value(execute_instance[key])
+    from mist.generator import RequestGenerator
 
-    return json.dumps(generated_obj)
+    return RequestGenerator(function_json.get('execute', dict())).generate_json()
 
 
 def generate_value(param_type):
-    t = param_type['type']
-    args = param_type.get('args', [])
-
-    if t == 'MObj':
-        return {k: generate_value(v) for k, v in param_type.get('fields', {}).items()}
-    if t == 'MMap':
-        return {generate_value(args[0]): generate_value(args[1])}
-    if t == 'MList':
-        return [generate_value(args[0])]
-    if t == 'MOption':
-        return generate_value(args[0])
-
-    if t == 'MString':
-        return 'string'
-    if t == 'MAny':
-        return {}
-    if t == 'MInt':
-        return math.ceil(random.random() * 10)
-    if t == 'MDouble':
-        return random.random()
+    from mist.generator import RequestGenerator
+
+    return RequestGenerator({'value': param_type}).generate()['value']
 
 
 def print_examples(mist_app, deployment):
@@ -352,11 +757,7 @@ def print_examples(mist_app, deployment):
 
 
 def easy_glob(root, pattern):
-    matches = []
-    for root, _, filenames in os.walk(root):
-        for filename in fnmatch.filter(filenames, pattern):
-            matches.append(os.path.join(root, filename))
-    return matches
+    return list(find_files(root, pattern))
 
 
 @mist_cli.command('apply', help="""
@@ -374,16 +775,55 @@ def easy_glob(root, pattern):
               """,
               required=True, type=click.Path(exists=True, file_okay=True))
 @click.option('--validate', type=bool, default=True)
-def apply(ctx, mist_app, user, file, validate):
+@click.option('--parallelism',
+              type=click.IntRange(1, None),
+              default=1,
+              show_default=True,
+              help='Max number of independent entries applied concurrently')
+@click.option('--incremental',
+              is_flag=True,
+              help='Skip entries unchanged since the last incremental apply to the same server, '
+                   'as recorded in apply-state.json in --cache-dir')
+@click.option('--state-file',
+              type=click.Path(dir_okay=False),
+              help='File with hashes of applied entries, turns on --incremental')
+@click.option('--full', is_flag=True, help='Apply all entries even if they are unchanged since the last apply')
+@click.option('--parse-processes',
+              type=click.IntRange(1, None),
+              help='Number of processes parsing config files of large trees, cpu count by default')
+@click.option('--changed-since',
+              metavar='GIT_REF',
+              help='Apply only config files changed in the working tree since the git commit, branch or tag')
+def apply(ctx, mist_app, user, file, validate, parallelism, incremental, state_file, full, parse_processes,
+          changed_since):
     mist_app.validate = validate
+    mist_app.parallelism = parallelism
+    if incremental and state_file is None and mist_app.cache_dir is not None:
+        state_file = os.path.join(mist_app.cache_dir, 'apply-state.json')
+    if state_file is not None:
+        server = '{}:{}'.format(mist_app.host, mist_app.port)
+        mist_app.apply_state = ApplyState(state_file, server, force=full).load()
+    mist_app.transport.pool_size = max(mist_app.transport.pool_size, parallelism)
+    # apply decides between create and update, it must see the current state of mist
+    mist_app.transport.cache = None
+
+    if mist_app.cache_dir is not None:
+        mist_app.parse_cache = ParseCache(os.path.join(mist_app.cache_dir, 'parse-cache.json'), cli_version).load()
+        ctx.call_on_close(mist_app.parse_cache.save)
 
     if os.path.isfile(file):
         deployments = [mist_app.parse_deployment(file)]
     else:
-        deployments = sorted(map(
-            mist_app.parse_deployment,
-            easy_glob(os.path.abspath(file), '*.conf')
-        ), key=lambda t: t[0])
+        root = os.path.abspath(file)
+        ignore = IgnoreRules.load(root)
+        if changed_since is not None:
+            paths = changed_files(root, changed_since, '*.conf', ignore)
+        else:
+            paths = find_files(root, '*.conf', ignore)
+        try:
+            deployments = sorted(mist_app.parse_deployments(paths, parse_processes), key=lambda t: t[0])
+        except GitException as e:
+            raise click.BadParameter(str(e), param_hint='--changed-since')
     click.echo("Process {} file entries".format(len(deployments)))
     depls = list(map(lambda t: t[1].with_user(user), deployments))
     with_errors = mist_app.update_deployments(depls)
@@ -0,0 +1,183 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import click
+
+TTL = 30.0
+LOCK_TIMEOUT = 60.0
+REFRESH_TIMEOUT = 5.0
+ACTIVE_JOB_STATUSES = 'queued,initialized,started'
+
+
+def fetch_names(mist_app, kind):
+    """
+    :type mist_app: mist.app.MistApp
+    :param kind: one of functions, jobs, workers
+    :rtype: list
+    """
+    if kind == 'functions':
+        return [f.name for f in mist_app.functions()]
+    if kind == 'jobs':
+        return [j.job_id for j in mist_app.jobs(ACTIVE_JOB_STATUSES)]
+    if kind == 'workers':
+        return [w.name for w in mist_app.workers()]
+    raise ValueError('Unknown completion kind {}'.format(kind))
+
+
+class CompletionCache(object):
+    """
+    Names of remote functions, jobs and workers for shell completion, one json
+    file per mist server. Completion reads the file only and never waits for
+    mist: stale or missing entries are refreshed by a detached process, so
+    the next TAB sees fresh names.
+    """
+
+    def __init__(self, path, ttl=TTL):
+        """
+        :param path: json file of the cache
+        :param ttl: seconds after which names are refreshed
+        """
+        self.path = path
+        self.ttl = ttl
+
+    @staticmethod
+    def for_server(cache_dir, host, port, ttl=TTL):
+        return CompletionCache(os.path.join(cache_dir, 'completion', '{}_{}.json'.format(host, port)), ttl)
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return dict()
+
+    def names(self, kind):
+        """
+        :param kind: one of functions, jobs, workers
+        :return: cached names and whether they are still fresh
+        :rtype: tuple
+        """
+        entry = self.load().get(kind)
+        if entry is None:
+            return [], False
+        return entry['names'], time.time() - entry['time'] < self.ttl
+
+    def store(self, kind, names):
+        directory = os.path.dirname(self.path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        data = self.load()
+        data[kind] = dict(time=time.time(), names=names)
+        tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.rename(tmp_path, self.path)
+
+    def _lock_path(self, kind):
+        return '{}.{}.lock'.format(self.path, kind)
+
+    def acquire_refresh(self, kind):
+        """
+        Only one refresh per kind runs at a time, a lock left by a crashed refresh expires.
+        :return: True if the caller should refresh
+        """
+        lock_path = self._lock_path(kind)
+        try:
+            if time.time() - os.path.getmtime(lock_path) > LOCK_TIMEOUT:
+                os.remove(lock_path)
+        except OSError:
+            pass
+        try:
+            directory = os.path.dirname(self.path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except OSError:
+            return False
+
+    def release_refresh(self, kind):
+        try:
+            os.remove(self._lock_path(kind))
+        except OSError:
+            pass
+
+    def refresh(self, mist_app, kind):
+        """
+        :type mist_app: mist.app.MistApp
+        """
+        try:
+            self.store(kind, fetch_names(mist_app, kind))
+        finally:
+            self.release_refresh(kind)
+
+    def refresh_in_background(self, host, port, kind):
+        if not self.acquire_refresh(kind):
+            return
+        kwargs = dict()
+        if hasattr(os, 'setsid'):
+            kwargs['preexec_fn'] = os.setsid
+        devnull = open(os.devnull, 'r+')
+        try:
+            subprocess.Popen(
+                [sys.executable, '-m', 'mist.completion', self.path, host, str(port), kind],
+                stdin=devnull, stdout=devnull, stderr=devnull, close_fds=True, **kwargs
+            )
+        except OSError:
+            self.release_refresh(kind)
+        finally:
+            devnull.close()
+
+
+def complete(ctx, kind, incomplete):
+    """
+    :type ctx: click.core.Context
+    :param ctx: context of the completed command, mist_cli callback is not invoked during completion
+    :param kind: one of functions, jobs, workers
+    :param incomplete: typed prefix
+    :return: matching names
+    :rtype: list
+    """
+    params = ctx.find_root().params
+    host = params.get('host') or 'localhost'
+    port = params.get('port') or 2004
+    cache_dir = params.get('cache_dir') or click.get_app_dir('mist-cli')
+    cache = CompletionCache.for_server(cache_dir, host, port)
+    names, fresh = cache.names(kind)
+    if not fresh:
+        cache.refresh_in_background(host, port, kind)
+    incomplete = incomplete or ''
+    return [name for name in names if name.startswith(incomplete)]
+
+
+def completion_kwargs(kind):
+    """
+    Dynamic completion of argument values for click.argument, shell_complete
+    since click 8 and autocompletion for click 7.
+    :param kind: one of functions, jobs, workers
+    :rtype: dict
+    """
+    if hasattr(click.Parameter, 'shell_complete'):
+        return dict(shell_complete=lambda ctx, param, incomplete: complete(ctx, kind, incomplete))
+    if 'autocompletion' in click.Parameter.__init__.__code__.co_varnames:
+        return dict(autocompletion=lambda ctx, args, incomplete: complete(ctx, kind, incomplete))
+    return dict()
+
+
+def main(argv):
+    from mist.app import MistApp
+    from mist.transport import Transport
+
+    path, host, port, kind = argv
+    mist_app = MistApp(host, int(port), transport=Transport.create(timeout=REFRESH_TIMEOUT, retries=0))
+    try:
+        CompletionCache(path).refresh(mist_app, kind)
+    finally:
+        mist_app.close()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main(sys.argv[1:])
@@ -0,0 +1,156 @@
+import os
+from fnmatch import fnmatchcase
+
+try:  # pragma: no cover
+    from os import scandir
+except ImportError:  # pragma: no cover
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+IGNORE_FILE = '.mistignore'
+# version control metadata, dependencies and maven/sbt outputs full of unrelated confs,
+# names that can be deployment directories are left to .mistignore
+DEFAULT_IGNORES = ('.git/', '.hg/', '.svn/', 'node_modules/', 'target/', '__pycache__/', '.tox/', '.venv/')
+
+
+class GitException(Exception):
+    pass
+
+
+class IgnoreRules(object):
+    """
+    Subset of .gitignore syntax: one glob per line, # comments, a trailing /
+    matches directories only, a pattern with a / elsewhere is matched against
+    the path relative to the root, otherwise against the name. ! re-includes
+    paths excluded by earlier rules, the last matching rule wins.
+    """
+
+    def __init__(self, lines=DEFAULT_IGNORES):
+        self.rules = []
+        for line in lines:
+            self.add(line)
+
+    def add(self, line):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            return
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        anchored = '/' in line
+        self.rules.append((line.lstrip('/'), negate, dir_only, anchored))
+
+    @staticmethod
+    def load(root, defaults=DEFAULT_IGNORES):
+        """
+        :param root: directory with an optional .mistignore file
+        :param defaults: rules applied before the ones of the file
+        :rtype: IgnoreRules
+        """
+        rules = IgnoreRules(defaults)
+        path = os.path.join(root, IGNORE_FILE)
+        if os.path.isfile(path):
+            with open(path, 'r') as f:
+                for line in f:
+                    rules.add(line)
+        return rules
+
+    def ignored(self, rel_path, is_dir):
+        """
+        :param rel_path: path relative to the root with / separators
+        :param is_dir: path is a directory
+        """
+        name = rel_path.rsplit('/', 1)[-1]
+        result = False
+        for pattern, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if fnmatchcase(rel_path if anchored else name, pattern):
+                result = not negate
+        return result
+
+
+def _entries(path):
+    """
+    :return: sorted (name, is_dir) of directory entries, symlinks to directories are not followed
+    """
+    if scandir is not None:
+        entries = [(e.name, e.is_dir(follow_symlinks=False)) for e in scandir(path)]
+    else:  # pragma: no cover
+        entries = [(name, os.path.isdir(os.path.join(path, name)) and not os.path.islink(os.path.join(path, name)))
+                   for name in os.listdir(path)]
+    entries.sort()
+    return entries
+
+
+def find_files(root, pattern, ignore=None):
+    """
+    Walks the tree with one scandir per directory, ignored directories are
+    not entered. Files of a directory come before files of its subdirectories.
+    :param root: directory to search
+    :param pattern: glob matched against file names, e.g. *.conf
+    :type ignore: IgnoreRules
+    :param ignore: rules of skipped paths, nothing is skipped by default
+    :return: generator of file paths under root
+    """
+    stack = [(root, '')]
+    while stack:
+        path, rel_path = stack.pop()
+        subdirs = []
+        for name, is_dir in _entries(path):
+            child_rel = rel_path + name
+            if ignore is not None and ignore.ignored(child_rel, is_dir):
+                continue
+            if is_dir:
+                subdirs.append((os.path.join(path, name), child_rel + '/'))
+            elif fnmatchcase(name, pattern):
+                yield os.path.join(path, name)
+        stack.extend(reversed(subdirs))
+
+
+def changed_files(root, ref, pattern, ignore=None):
+    """
+    Files under root changed in the working tree since a git ref, including
+    untracked ones. Deleted files are skipped.
+    :param ref: git commit, branch or tag
+    :raise GitException: if root is not in a git repository or ref is unknown
+    :return: generator of file paths under root
+    """
+    import subprocess
+
+    commands = [
+        ['git', 'diff', '--name-only', '--relative', '-z', ref, '--', '.'],
+        ['git', 'ls-files', '--others', '--exclude-standard', '-z', '--', '.'],
+    ]
+    seen = set()
+    for command in commands:
+        process = subprocess.Popen(command, cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out, err = process.communicate()
+        if process.returncode != 0:
+            raise GitException('{} failed: {}'.format(' '.join(command), err.decode('utf-8', 'replace').strip()))
+        for rel_path in out.decode('utf-8').split('\0'):
+            if not rel_path or rel_path in seen:
+                continue
+            seen.add(rel_path)
+            if not fnmatchcase(rel_path.rsplit('/', 1)[-1], pattern) or _ignored_path(ignore, rel_path):
+                continue
+            path = os.path.join(root, *rel_path.split('/'))
+            if os.path.isfile(path):
+                yield path
+
+
+def _ignored_path(ignore, rel_path):
+    """
+    :return: the file or any of its parent directories is ignored
+    """
+    if ignore is None:
+        return False
+    parts = rel_path.split('/')
+    for i in range(1, len(parts)):
+        if ignore.ignored('/'.join(parts[:i]), True):
+            return True
+    return ignore.ignored(rel_path, False)
@@ -0,0 +1,218 @@
+import heapq
+import threading
+import time
+from collections import defaultdict
+
+try:  # pragma: no cover
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+
+class DependencyFailedException(Exception):
+    def __init__(self, dependency):
+        super(DependencyFailedException, self).__init__('dependency {} failed'.format(dependency))
+        self.dependency = dependency
+
+
+def deployment_dependencies(deployments):
+    """
+    Function depends on its context and on the artifact referenced by path,
+    when they are deployed within the same batch.
+    :type deployments: list of mist.models.Deployment
+    :param deployments:
+    :return: index of deployment -> set of indexes it depends on
+    :rtype: dict
+    """
+    index = dict()
+    for i, d in enumerate(deployments):
+        index[(d.model_type, d.get_name())] = i
+
+    dependencies = dict()
+    for i, d in enumerate(deployments):
+        deps = set()
+        if d.model_type == 'Function':
+            refs = [('Context', d.data.get('context', 'default')), ('Artifact', d.data.get('path', None))]
+            for ref in refs:
+                j = index.get(ref)
+                if j is not None and j != i:
+                    deps.add(j)
+        dependencies[i] = deps
+    return dependencies
+
+
+def check_cycles(dependencies):
+    """
+    :type dependencies: dict
+    :param dependencies: node -> set of nodes it depends on
+    :raise ValueError: if graph contains a cycle
+    """
+    pending = dict((node, set(deps)) for node, deps in dependencies.items())
+    ready = [node for node, deps in pending.items() if not deps]
+    dependents = defaultdict(list)
+    for node, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].append(node)
+    visited = 0
+    while ready:
+        node = ready.pop()
+        visited += 1
+        for dependent in dependents[node]:
+            pending[dependent].discard(node)
+            if not pending[dependent]:
+                ready.append(dependent)
+    if visited != len(pending):
+        cycle = sorted(node for node, deps in pending.items() if deps)
+        raise ValueError('Dependency cycle between entries: {}'.format(cycle))
+
+
+class DependencyExecutor(object):
+    """
+    Runs a function over graph nodes once all their dependencies succeeded.
+    Ready nodes are picked in index order, so with parallelism 1 nodes run
+    exactly in the given order when it is a valid topological order.
+    """
+
+    def __init__(self, parallelism=1):
+        self.parallelism = parallelism
+
+    def run(self, dependencies, fn):
+        """
+        :type dependencies: dict
+        :param dependencies: node index -> set of node indexes it depends on
+        :param fn: function called with node index
+        :return: generator of (node index, exception or None) in completion order
+        """
+        check_cycles(dependencies)
+        pending = dict((node, set(deps)) for node, deps in dependencies.items())
+        dependents = defaultdict(list)
+        for node, deps in dependencies.items():
+            for dep in deps:
+                dependents[dep].append(node)
+
+        ready = [node for node, deps in pending.items() if not deps]
+        heapq.heapify(ready)
+        done = Queue()
+        finished = set()
+        running = 0
+        pool = None
+        if self.parallelism > 1:
+            from multiprocessing.pool import ThreadPool
+            pool = ThreadPool(self.parallelism)
+
+        def call(node):
+            try:
+                fn(node)
+                return node, None
+            except Exception as e:
+                return node, e
+
+        try:
+            while ready or running:
+                while ready and running < self.parallelism:
+                    node = heapq.heappop(ready)
+                    running += 1
+                    if pool is None:
+                        done.put(call(node))
+                    else:
+                        pool.apply_async(call, (node,), callback=done.put)
+
+                node, error = done.get()
+                running -= 1
+                finished.add(node)
+                yield node, error
+
+                for dependent in dependents[node]:
+                    if dependent in finished:
+                        continue
+                    if error is not None:
+                        finished.add(dependent)
+                        running += 1
+                        done.put((dependent, DependencyFailedException(node)))
+                        continue
+                    pending[dependent].discard(node)
+                    if not pending[dependent]:
+                        heapq.heappush(ready, dependent)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+
+def bounded_imap(fn, items, parallelism=1, max_pending=None):
+    """
+    Like ThreadPool.imap_unordered, but items are pulled from the iterable
+    lazily, so at most max_pending items are held at once whatever the
+    size of the input.
+    :param fn: function called with item
+    :param items: iterable of items
+    :param parallelism: number of threads
+    :param max_pending: max number of taken but not yet yielded items, twice parallelism by default
+    :return: generator of (item, result, exception or None) in completion order
+    """
+    def call(item):
+        try:
+            return item, fn(item), None
+        except Exception as e:
+            return item, None, e
+
+    if parallelism <= 1:
+        for item in items:
+            yield call(item)
+        return
+
+    from multiprocessing.pool import ThreadPool
+
+    max_pending = max_pending or parallelism * 2
+    items = iter(items)
+    done = Queue()
+    pending = 0
+    exhausted = False
+    pool = ThreadPool(parallelism)
+    try:
+        while True:
+            while not exhausted and pending < max_pending:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pool.apply_async(call, (item,), callback=done.put)
+                pending += 1
+            if not pending:
+                break
+            yield done.get()
+            pending -= 1
+    finally:
+        pool.close()
+        pool.join()
+
+
+class TokenBucket(object):
+    """
+    Thread safe rate limiter: acquire blocks until a token is available.
+    Tokens are refilled at rate per second up to capacity, so bursts of
+    capacity calls pass at once.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        :param rate: tokens per second
+        :param capacity: max number of stored tokens, one second of tokens by default
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated_at = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.time()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            # a missing token is reserved, the caller sleeps until it is refilled
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+
+BLOCK_SIZE = 2 ** 20
+
+
+def sha1_file(file_path, block_size=BLOCK_SIZE):
+    """
+    :param file_path:
+    :param block_size: size of a single read, hashlib releases the GIL for large blocks
+    :return: hex sha1 of file content
+    :rtype: str
+    """
+    sha1sum = hashlib.sha1()
+    buf = bytearray(block_size)
+    view = memoryview(buf)
+    with open(file_path, 'rb') as source:
+        n = source.readinto(buf)
+        while n:
+            sha1sum.update(view[:n])
+            n = source.readinto(buf)
+    return sha1sum.hexdigest()
+
+
+def stat_key(file_path):
+    st = os.stat(file_path)
+    return [st.st_size, getattr(st, 'st_mtime_ns', st.st_mtime), st.st_ino]
+
+
+class HashCache(object):
+    """
+    File sha1 cache keyed by absolute path and validated by (size, mtime, inode),
+    so files that did not change are never hashed again. Persisted as json
+    when path is given, in memory only otherwise.
+    """
+
+    def __init__(self, path=None, workers=None):
+        """
+        :param path: json file to persist the cache in
+        :param workers: number of threads used by sha1_many, cpu count by default
+        """
+        self.path = path
+        self.workers = workers
+        self.entries = dict()
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def load(self):
+        if self.path is not None and os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+            except ValueError:
+                self.entries = dict()
+        return self
+
+    def save(self):
+        if self.path is None or not self._dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        tmp_path = self.path + '.tmp'
+        with self._lock:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            self._dirty = False
+        os.rename(tmp_path, self.path)
+
+    def sha1(self, file_path):
+        """
+        :param file_path:
+        :return: hex sha1 of file content
+        :rtype: str
+        """
+        abs_path = os.path.abspath(file_path)
+        key = stat_key(abs_path)
+        with self._lock:
+            entry = self.entries.get(abs_path)
+        if entry is not None and entry[:3] == key:
+            return entry[3]
+        sha = sha1_file(abs_path)
+        with self._lock:
+            self.entries[abs_path] = key + [sha]
+            self._dirty = True
+        return sha
+
+    def sha1_many(self, file_paths):
+        """
+        Hashes files concurrently.
+        :param file_paths:
+        :return: file path -> hex sha1
+        :rtype: dict
+        """
+        import multiprocessing
+        from multiprocessing.pool import ThreadPool
+
+        file_paths = list(set(file_paths))
+        workers = self.workers or multiprocessing.cpu_count()
+        if len(file_paths) <= 1 or workers <= 1:
+            return dict((p, self.sha1(p)) for p in file_paths)
+        pool = ThreadPool(min(workers, len(file_paths)))
+        try:
+            return dict(zip(file_paths, pool.map(self.sha1, file_paths)))
+        finally:
+            pool.close()
+            pool.join()
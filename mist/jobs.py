@@ -0,0 +1,156 @@
+import heapq
+import json
+import time
+from collections import OrderedDict
+
+from mist.executor import TokenBucket, bounded_imap
+
+FINAL_STATUSES = frozenset(['finished', 'failed', 'canceled'])
+
+
+class WaitTimeoutException(Exception):
+    def __init__(self, job_ids):
+        super(WaitTimeoutException, self).__init__(
+            'Timed out waiting for jobs: {}'.format(', '.join(sorted(job_ids)))
+        )
+        self.job_ids = job_ids
+
+
+def job_result(job):
+    """
+    Result of a finished job in the same shape as a synchronous start of the job.
+    :type job: dict
+    :param job: job info returned by mist
+    :rtype: dict
+    """
+    if job['status'] == 'finished':
+        return dict(success=True, payload=job.get('jobResult'), errors=[])
+    error = job.get('error') or 'Job {}'.format(job['status'])
+    return dict(success=False, payload=None, errors=[error])
+
+
+class JobWaiter(object):
+    """
+    Polls status of many jobs from a single thread. Every job has its own
+    exponential backoff, so long jobs are polled rarely and no connection is
+    held while a job runs: each poll is a short request over the shared
+    keep-alive session.
+    """
+
+    def __init__(self, mist_app, interval=0.5, max_interval=10.0, timeout=None, on_change=None):
+        """
+        :type mist_app: mist.app.MistApp
+        :param interval: first poll delay in seconds
+        :param max_interval: max poll delay in seconds
+        :param timeout: seconds to wait for all jobs, forever by default
+        :param on_change: called with job info when status of a job changes
+        """
+        self.mist_app = mist_app
+        self.interval = interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.on_change = on_change
+
+    def wait(self, job_ids):
+        """
+        :param job_ids:
+        :return: generator of job info in order jobs reach a final status
+        :raise WaitTimeoutException: when timeout passes before all jobs are done
+        """
+        started = time.time()
+        deadline = started + self.timeout if self.timeout is not None else None
+        statuses = dict()
+        queue = [(started, i, job_id, self.interval) for i, job_id in enumerate(job_ids)]
+        heapq.heapify(queue)
+        while queue:
+            poll_at, i, job_id, delay = heapq.heappop(queue)
+            if deadline is not None and poll_at > deadline:
+                raise WaitTimeoutException([q[2] for q in queue] + [job_id])
+            now = time.time()
+            if poll_at > now:
+                time.sleep(poll_at - now)
+
+            job = self.mist_app.get_job(job_id)
+            status = job.get('status')
+            if statuses.get(job_id) != status:
+                statuses[job_id] = status
+                if self.on_change is not None:
+                    self.on_change(job)
+                delay = self.interval
+            else:
+                delay = min(delay * 2, self.max_interval)
+
+            if status in FINAL_STATUSES:
+                yield job
+            else:
+                heapq.heappush(queue, (time.time() + delay, i, job_id, delay))
+
+
+def read_requests(lines):
+    """
+    :param lines: iterable of json lines
+    :return: generator of (line number, request text), blank lines are skipped
+    """
+    for i, line in enumerate(lines, 1):
+        line = line.strip()
+        if line:
+            yield i, line
+
+
+def submit_jobs(mist_app, function, lines, parallelism=4, rate=None):
+    """
+    Starts a job for every request line asynchronously. Lines are read as
+    they are submitted and results are produced as they come, so memory
+    use does not depend on the number of requests.
+    :type mist_app: mist.app.MistApp
+    :param function: function name
+    :param lines: iterable of json requests, one per line
+    :param parallelism: max number of concurrent submissions
+    :param rate: max submissions per second, unlimited by default
+    :return: generator of result dicts with line, jobId, status, latency_ms and error
+    """
+    bucket = TokenBucket(rate) if rate else None
+
+    def submit(entry):
+        _, line = entry
+        req = json.loads(line)
+        if bucket is not None:
+            bucket.acquire()
+        started = time.time()
+        try:
+            return mist_app.submit_job(function, req), time.time() - started
+        except Exception as e:
+            e.latency = time.time() - started
+            raise
+
+    for (line_no, _), result, error in bounded_imap(submit, read_requests(lines), parallelism):
+        if error is None:
+            job_id, latency = result
+        else:
+            job_id, latency = None, getattr(error, 'latency', None)
+        yield OrderedDict([
+            ('line', line_no),
+            ('jobId', job_id),
+            ('status', 'submitted' if error is None else 'failed'),
+            ('latency_ms', round(latency * 1000, 3) if latency is not None else None),
+            ('error', None if error is None else error_message(error)),
+        ])
+
+
+def cancel_jobs(mist_app, job_ids, parallelism=8):
+    """
+    Cancels jobs concurrently, at most parallelism requests are in flight.
+    :type mist_app: mist.app.MistApp
+    :param job_ids: iterable of job ids
+    :param parallelism: max number of concurrent cancellations
+    :return: generator of (job id, error message or None) in completion order
+    """
+    for job_id, _, error in bounded_imap(mist_app.cancel_job, job_ids, parallelism):
+        yield job_id, None if error is None else error_message(error)
+
+
+def error_message(error):
+    response = getattr(error, 'response', None)
+    if response is not None:
+        return '{} {}'.format(response.status_code, response.text)
+    return str(error) or type(error).__name__
@@ -16,6 +16,20 @@ def snake_case_to_camel_case(param_name):
     return first + ''.join(word.capitalize() for word in rest)
 
 
+_interned = dict()
+_string_types = (str, type(u''))
+
+
+def intern_string(value):
+    """
+    Returns one shared instance of equal strings, so values repeated in large
+    listings are stored once. Works for unicode on python 2 too, unlike intern.
+    """
+    if not isinstance(value, _string_types):
+        return value
+    return _interned.setdefault(value, value)
+
+
 def camel_case_to_dashed_case(name):
     s1 = re.sub('(.)([A-Z][a-z]+)', r'\1-\2', name)
     return re.sub('([a-z0-9])([A-Z])', r'\1-\2', s1).lower()
@@ -23,6 +37,7 @@ def camel_case_to_dashed_case(name):
 
 class PrettyRow(object):
     __metaclass__ = ABCMeta
+    __slots__ = ()
     header = []
 
     @staticmethod
@@ -33,10 +48,20 @@ class PrettyRow(object):
 
 class JsonConfig(object):
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     def to_json(self):
-        obj = self.__dict__
-        return dict([(snake_case_to_camel_case(k), v) for k, v in obj.items()])
+        return dict([(snake_case_to_camel_case(k), v) for k, v in self._attributes()])
+
+    def _attributes(self):
+        """
+        :return: pairs of name and value of public attributes, stored in slots or in __dict__
+        :rtype: list
+        """
+        names = [k for cls in type(self).__mro__ for k in getattr(cls, '__slots__', ()) if not k.startswith('_')]
+        items = [(k, getattr(self, k)) for k in names if hasattr(self, k)]
+        items.extend(getattr(self, '__dict__', dict()).items())
+        return items
 
     @staticmethod
     @abstractmethod
@@ -51,6 +76,7 @@ class JsonConfig(object):
 
 class NamedConfig(JsonConfig):
     __metaclass__ = ABCMeta
+    __slots__ = ('name',)
 
     def __init__(self, name):
         self.name = name
@@ -68,6 +94,7 @@ class NamedConfig(JsonConfig):
 
 
 class Context(NamedConfig, PrettyRow):
+    __slots__ = ('context_config',)
     header = ['ID', 'WORKER MODE']
 
     @staticmethod
@@ -108,6 +135,7 @@ class Context(NamedConfig, PrettyRow):
 
 
 class Function(NamedConfig, PrettyRow):
+    __slots__ = ('default_context', 'class_name', 'path')
     header = ['FUNCTION', 'DEFAULT CONTEXT', 'PATH', 'CLASS NAME']
 
     def __init__(self, name, class_name=None, context=None, path=None):
@@ -136,7 +164,7 @@ class Function(NamedConfig, PrettyRow):
         return Function(
             data['name'],
             data['className'],
-            Context(data.get('defaultContext', 'default')),
+            Context(intern_string(data.get('defaultContext', 'default'))),
             data['path']
         )
 
@@ -151,9 +179,11 @@ class Function(NamedConfig, PrettyRow):
 
 
 class Job(JsonConfig, PrettyRow):
+    __slots__ = ('job_id', 'function', 'context', 'source', 'status', 'external_id', 'worker_id', '_start_time')
     header = ['UID', 'START TIME', 'NAMESPACE', 'EXT ID', 'FUNCTION', 'SOURCE', 'STATUS']
 
-    def __init__(self, job_id, function_id, context, source, status, external_id=None, start_time=None):
+    def __init__(self, job_id, function_id, context, source, status, external_id=None, start_time=None,
+                 worker_id=None):
         self.job_id = job_id
         self.function = function_id
         self.context = context
@@ -162,9 +192,23 @@ class Job(JsonConfig, PrettyRow):
         if external_id is None:
             external_id = ''
         self.external_id = external_id
-        if start_time is not None:
-            start_time = datetime.datetime.fromtimestamp(start_time / 1000.0)
-        self.start_time = start_time
+        self.worker_id = worker_id
+        # milliseconds since epoch, converted to datetime on first access
+        self._start_time = start_time
+
+    @property
+    def start_time(self):
+        start_time = self._start_time
+        if start_time is not None and not isinstance(start_time, datetime.datetime):
+            start_time = self._start_time = datetime.datetime.fromtimestamp(start_time / 1000.0)
+        return start_time
+
+    @start_time.setter
+    def start_time(self, value):
+        self._start_time = value
+
+    def _attributes(self):
+        return super(Job, self)._attributes() + [('start_time', self.start_time)]
 
     @staticmethod
     def to_row(job):
@@ -181,13 +225,14 @@ class Job(JsonConfig, PrettyRow):
     @staticmethod
     def from_json(data):
         return Job(
-            data['jobId'], data['function'], data['context'],
-            data['source'], data['status'], data.get('externalId', ''),
-            data.get('startTime', None)
+            data['jobId'], intern_string(data['function']), intern_string(data['context']),
+            intern_string(data['source']), intern_string(data['status']), data.get('externalId', ''),
+            data.get('startTime', None), data.get('workerId', None)
         )
 
 
 class Worker(JsonConfig, PrettyRow):
+    __slots__ = ('name', 'address', 'spark_ui')
     header = ['ID', 'ADDRESS', 'SPARK UI']
 
     @staticmethod
@@ -214,6 +259,8 @@ class Worker(JsonConfig, PrettyRow):
 
 
 class Artifact(NamedConfig):
+    __slots__ = ('file_path',)
+
     @staticmethod
     def from_json(data):
         raise NotImplementedError
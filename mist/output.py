@@ -0,0 +1,107 @@
+import csv
+import itertools
+import json
+from collections import OrderedDict
+
+import click
+
+FORMATS = ('table', 'json', 'jsonl', 'csv', 'tsv')
+SAMPLE_SIZE = 100
+
+
+def field_names(header):
+    """
+    :param header: table header, e.g. ['START TIME']
+    :return: keys of machine readable records, e.g. ['start_time']
+    """
+    return [h.lower().replace(' ', '_') for h in header]
+
+
+def cell(value):
+    return '' if value is None else str(value)
+
+
+class _EchoFile(object):
+    def write(self, data):
+        click.echo(data, nl=False)
+
+
+def write_table(rows, header, bordered=False, sample_size=SAMPLE_SIZE):
+    """
+    Streams a plain table: column widths are taken from the header and a
+    sample of first rows, later rows that are longer overflow their column
+    instead of being wrapped. Bordered tables are drawn by texttable at once.
+    """
+    rows = iter(rows)
+    sample = list(itertools.islice(rows, sample_size))
+    if bordered:
+        from texttable import Texttable
+
+        table = Texttable()
+        table.set_cols_align(list(map(lambda _: 'l', header)))
+        table.set_deco(Texttable.BORDER | Texttable.HEADER | Texttable.HLINES | Texttable.VLINES)
+        table.add_rows([header] + sample + list(rows))
+        click.echo(table.draw())
+        return
+
+    widths = [len(h) for h in header]
+    for row in sample:
+        widths = [max(w, len(cell(value))) for w, value in zip(widths, row)]
+
+    def line(values):
+        return '   '.join(cell(value).ljust(w) for w, value in zip(widths, values)).rstrip()
+
+    click.echo(line(header))
+    for row in itertools.chain(sample, rows):
+        click.echo(line(row))
+
+
+def write_json(rows, header):
+    fields = field_names(header)
+    click.echo('[', nl=False)
+    for i, row in enumerate(rows):
+        click.echo((',\n' if i else '\n') + json.dumps(OrderedDict(zip(fields, row))), nl=False)
+    click.echo('\n]')
+
+
+def write_jsonl(rows, header):
+    fields = field_names(header)
+    for row in rows:
+        click.echo(json.dumps(OrderedDict(zip(fields, row))))
+
+
+def write_delimited(rows, header, delimiter):
+    writer = csv.writer(_EchoFile(), delimiter=delimiter, lineterminator='\n')
+    writer.writerow(field_names(header))
+    for row in rows:
+        writer.writerow([cell(value) for value in row])
+
+
+def write_rows(rows, header, output='table', bordered=False):
+    """
+    Prints rows one by one as they come from the iterable.
+    :param rows: iterable of rows
+    :param header: column names
+    :param output: one of FORMATS
+    :param bordered: draw borders around table cells
+    """
+    if output == 'table':
+        write_table(rows, header, bordered)
+    elif output == 'json':
+        write_json(rows, header)
+    elif output == 'jsonl':
+        write_jsonl(rows, header)
+    elif output == 'csv':
+        write_delimited(rows, header, ',')
+    elif output == 'tsv':
+        write_delimited(rows, header, '\t')
+    else:
+        raise ValueError('Unknown output format {}'.format(output))
+
+
+def output_option(f):
+    return click.option('-o', '--output',
+                        type=click.Choice(FORMATS),
+                        default='table',
+                        show_default=True,
+                        help='Output format, json lines, csv and tsv are machine readable and streamed row by row')(f)
@@ -0,0 +1,212 @@
+import datetime
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from mist.hashing import stat_key
+
+INCLUDE = re.compile(r'^\s*include\s+(?:required\s*\(\s*)?(?:file\s*\(\s*)?"([^"]+)"', re.MULTILINE)
+SUBSTITUTION = re.compile(r'\$\{\??\s*([^}\s]+)\s*\}')
+# layout of cached entries, files of other formats are dropped
+FORMAT = 2
+
+
+def file_dependencies(file_path):
+    """
+    Files included by a HOCON file, recursively, and names of substitutions
+    that may be resolved from environment variables.
+    :param file_path: absolute path of the file
+    :return: included absolute paths, substitution names
+    :rtype: tuple
+    """
+    includes = set()
+    names = set()
+    queue = [file_path]
+    while queue:
+        path = queue.pop()
+        try:
+            with open(path, 'r') as f:
+                text = f.read()
+        except (IOError, OSError):
+            continue
+        names.update(SUBSTITUTION.findall(text))
+        for include in INCLUDE.findall(text):
+            include = os.path.normpath(os.path.join(os.path.dirname(path), include))
+            if include not in includes and include != file_path:
+                includes.add(include)
+                queue.append(include)
+    return includes, names
+
+
+def _encode(value):
+    # pyhocon parses durations like 1s into timedelta
+    if isinstance(value, datetime.timedelta):
+        return {'__timedelta__': [value.days, value.seconds, value.microseconds]}
+    raise TypeError('{!r} is not json serializable'.format(value))
+
+
+def _decode(pairs):
+    if len(pairs) == 1 and pairs[0][0] == '__timedelta__':
+        return datetime.timedelta(*pairs[0][1])
+    return OrderedDict(pairs)
+
+
+def _dependency_key(file_path):
+    try:
+        return stat_key(file_path)
+    except OSError:
+        return None
+
+
+def parse_entry(file_path):
+    """
+    Parses a deployment file into a cache entry. Runs in pool processes,
+    so it takes and returns plain values only.
+    :param file_path: absolute path of the file
+    :rtype: dict
+    """
+    from mist.app import MistApp
+
+    key = stat_key(file_path)
+    order, deployment = MistApp.parse_deployment(file_path)
+    return to_entry(file_path, key, order, deployment)
+
+
+def to_entry(file_path, key, order, deployment):
+    """
+    :param key: stat key of the file taken before it was parsed
+    :type deployment: mist.models.Deployment
+    :rtype: dict
+    """
+    includes, names = file_dependencies(file_path)
+    return dict(
+        key=key,
+        includes=dict((p, _dependency_key(p)) for p in includes),
+        env=dict((n, os.environ.get(n)) for n in names),
+        order=order,
+        name=deployment.name,
+        model_type=deployment.model_type,
+        version=deployment.version,
+        data=_plain(deployment.data),
+    )
+
+
+def from_entry(entry):
+    """
+    :rtype: tuple
+    :return: order and mist.models.Deployment, as returned by MistApp.parse_deployment
+    """
+    from mist.models import Deployment
+
+    return entry['order'], Deployment(entry['name'], entry['model_type'], _tree(entry['data']), entry['version'])
+
+
+def _plain(value):
+    """
+    Copies a parsed tree into dicts and lists. Keys are kept as stored by
+    pyhocon, with quotes around keys containing dots, unlike
+    ConfigTree.as_plain_ordered_dict.
+    """
+    if isinstance(value, dict):
+        return OrderedDict((k, _plain(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _tree(value):
+    """
+    Restores a tree copied by _plain. Keys are set as they are, ConfigTree.put
+    would split quoted keys with dots into nested trees.
+    """
+    from pyhocon import ConfigTree
+
+    if isinstance(value, dict):
+        tree = ConfigTree()
+        for k, v in value.items():
+            OrderedDict.__setitem__(tree, k, _tree(v))
+        return tree
+    if isinstance(value, list):
+        return [_tree(v) for v in value]
+    return value
+
+
+class ParseCache(object):
+    """
+    Parsed deployment files keyed by absolute path and validated by
+    (size, mtime, inode) of the file and of every file it includes, and by
+    environment variables it may refer to, so unchanged files are never
+    parsed again. Persisted as json when path is given, in memory only otherwise.
+    """
+
+    def __init__(self, path=None, version=None):
+        """
+        :param path: json file to persist the cache in
+        :param version: version of the cli, entries of other versions are dropped
+        """
+        self.path = path
+        self.version = version
+        self.entries = dict()
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def load(self):
+        if self.path is not None and os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    content = json.load(f, object_pairs_hook=_decode)
+            except ValueError:
+                content = dict()
+            if content.get('version') == self.version and content.get('format') == FORMAT:
+                self.entries = content.get('entries', dict())
+        return self
+
+    def save(self):
+        if self.path is None or not self._dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        tmp_path = self.path + '.tmp'
+        with self._lock:
+            with open(tmp_path, 'w') as f:
+                json.dump(dict(version=self.version, format=FORMAT, entries=self.entries), f, default=_encode)
+            self._dirty = False
+        os.rename(tmp_path, self.path)
+
+    def get(self, file_path):
+        """
+        :param file_path: absolute path of a deployment file
+        :return: valid cache entry or None
+        :rtype: dict
+        """
+        with self._lock:
+            entry = self.entries.get(file_path)
+        if entry is None:
+            return None
+        try:
+            if stat_key(file_path) != entry['key']:
+                return None
+        except OSError:
+            return None
+        for include, key in entry['includes'].items():
+            if _dependency_key(include) != key:
+                return None
+        for name, value in entry['env'].items():
+            if os.environ.get(name) != value:
+                return None
+        return entry
+
+    def put(self, file_path, entry):
+        """
+        Stores the entry unless its data has values json cannot keep.
+        """
+        try:
+            json.dumps(entry['data'], default=_encode)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self.entries[file_path] = entry
+            self._dirty = True
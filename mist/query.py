@@ -0,0 +1,162 @@
+import datetime
+import heapq
+import itertools
+import re
+from fnmatch import fnmatchcase
+
+SORT_KEYS = ('start_time', 'job_id', 'function', 'context', 'source', 'status')
+GLOB_CHARS = re.compile(r'[*?\[]')
+RELATIVE_TIME = re.compile(r'^(\d+(?:\.\d+)?)([smhdw])$')
+TIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M', '%Y-%m-%d')
+UNITS = dict(s='seconds', m='minutes', h='hours', d='days', w='weeks')
+
+
+def parse_time(value, now=None):
+    """
+    :param value: local time like 2018-05-30 12:00 or time ago like 30m, 2h, 1d
+    :param now: current time, used by relative values
+    :rtype: datetime.datetime
+    :raise ValueError: if value is not a time
+    """
+    match = RELATIVE_TIME.match(value.strip())
+    if match is not None:
+        now = now if now is not None else datetime.datetime.now()
+        return now - datetime.timedelta(**{UNITS[match.group(2)]: float(match.group(1))})
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            pass
+    raise ValueError('Expected time like 2018-05-30 12:00 or time ago like 30m, 2h, 1d, got {}'.format(value))
+
+
+def is_glob(pattern):
+    return pattern is not None and GLOB_CHARS.search(pattern) is not None
+
+
+class _Descending(object):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+class JobQuery(object):
+    """
+    Filters, sorts and limits a stream of jobs. Jobs are checked one by one
+    as they are parsed; only sorting holds jobs, at most limit of them when
+    limit is set.
+    """
+
+    def __init__(self, function=None, context=None, source=None, since=None, until=None, sort=None, limit=None):
+        """
+        :param function: function name or glob pattern
+        :param context: context name or glob pattern
+        :param source: job source or glob pattern, e.g. http, cli
+        :type since: datetime.datetime
+        :param since: jobs started at or after this time
+        :type until: datetime.datetime
+        :param until: jobs started before this time
+        :param sort: one of SORT_KEYS, prefixed with - for descending order
+        :param limit: max number of jobs
+        """
+        self.function = function
+        self.context = context
+        self.source = source
+        self.since = since
+        self.until = until
+        self.sort = sort
+        self.limit = limit
+        if sort is not None and sort.lstrip('-') not in SORT_KEYS:
+            raise ValueError('Unknown sort key {}, expected one of {}'.format(sort, ', '.join(SORT_KEYS)))
+
+    @property
+    def server_function(self):
+        """
+        :return: function name to list jobs of on the server, None when jobs of all functions are needed
+        """
+        return self.function if self.function is not None and not is_glob(self.function) else None
+
+    @property
+    def filters_on_client(self):
+        return bool(
+            (self.function is not None and self.server_function is None) or
+            self.context is not None or self.source is not None or
+            self.since is not None or self.until is not None
+        )
+
+    @property
+    def server_limit(self):
+        """
+        :return: limit applicable to server query, None when jobs are filtered or sorted locally
+        """
+        if self.filters_on_client or self.sort is not None:
+            return None
+        return self.limit
+
+    def matches(self, job):
+        """
+        :type job: mist.models.Job
+        """
+        if self.function is not None and not fnmatchcase(job.function, self.function):
+            return False
+        if self.context is not None and not fnmatchcase(job.context, self.context):
+            return False
+        if self.source is not None and not fnmatchcase(job.source, self.source):
+            return False
+        if self.since is not None or self.until is not None:
+            start_time = job.start_time
+            if start_time is None:
+                return False
+            if self.since is not None and start_time < self.since:
+                return False
+            if self.until is not None and start_time >= self.until:
+                return False
+        return True
+
+    def _sort_key(self):
+        name = self.sort.lstrip('-')
+        descending = self.sort.startswith('-')
+
+        def key(job):
+            value = getattr(job, name)
+            # jobs without start time go last in both orders
+            if value is None:
+                return True, None
+            return False, _Descending(value) if descending else value
+
+        return key
+
+    def apply(self, jobs):
+        """
+        :param jobs: iterable of mist.models.Job
+        :return: iterator of matching jobs
+        """
+        jobs = (job for job in jobs if self.matches(job))
+        if self.sort is None:
+            return itertools.islice(jobs, self.limit)
+        key = self._sort_key()
+        if self.limit is not None:
+            return iter(heapq.nsmallest(self.limit, jobs, key=key))
+        return iter(sorted(jobs, key=key))
+
+
+def query_jobs(mist_app, status_filter, query, offset=0, page_size=100):
+    """
+    Lists jobs matching the query, pushing the function and limit down to
+    the server query when possible.
+    :type mist_app: mist.app.MistApp
+    :param status_filter: comma separated statuses
+    :type query: JobQuery
+    :param offset: number of jobs skipped by the server
+    :param page_size: number of jobs requested at once
+    :return: iterator of mist.models.Job
+    """
+    jobs = mist_app.iter_jobs(status_filter, query.server_limit, offset, page_size, function=query.server_function)
+    return query.apply(jobs)
@@ -0,0 +1,82 @@
+import threading
+
+
+class RemoteState(object):
+    """
+    Snapshot of remote contexts and functions, each fetched at most once with
+    the list endpoint when first needed. Artifact checksums have no list
+    endpoint, so they are looked up on demand and memoized. Entries applied
+    during the run are recorded here, so the snapshot stays valid for the
+    rest of the apply. When a list endpoint fails, lookups fall back to the
+    per item endpoints.
+    """
+
+    def __init__(self, mist_app):
+        """
+        :type mist_app: mist.app.MistApp
+        :param mist_app:
+        """
+        self.mist_app = mist_app
+        self._lock = threading.Lock()
+        self._indexes = dict()
+        self.artifacts = dict()
+
+    def _index(self, name, fetch):
+        import requests
+
+        with self._lock:
+            if name not in self._indexes:
+                try:
+                    self._indexes[name] = dict((item.name, item) for item in fetch())
+                except (requests.exceptions.RequestException, ValueError):
+                    self._indexes[name] = None
+            return self._indexes[name]
+
+    @property
+    def contexts(self):
+        """
+        :return: context name -> Context or None if list endpoint failed
+        :rtype: dict
+        """
+        return self._index('contexts', self.mist_app.contexts)
+
+    @property
+    def functions(self):
+        """
+        :return: function name -> Function or None if list endpoint failed
+        :rtype: dict
+        """
+        return self._index('functions', self.mist_app.functions)
+
+    def has_context(self, name):
+        contexts = self.contexts
+        if contexts is not None and name in contexts:
+            return True
+        ctx = self.mist_app.get_context(name)
+        if ctx is not None and contexts is not None:
+            contexts[name] = ctx
+        return ctx is not None
+
+    def has_function(self, name):
+        functions = self.functions
+        if functions is None:
+            return self.mist_app.get_function_json(name) is not None
+        return name in functions
+
+    def artifact_sha(self, artifact_key):
+        if artifact_key not in self.artifacts:
+            self.artifacts[artifact_key] = self.mist_app.get_sha1(artifact_key)
+        return self.artifacts[artifact_key]
+
+    def add_context(self, context):
+        contexts = self._indexes.get('contexts')
+        if contexts is not None:
+            contexts[context.name] = context
+
+    def add_function(self, fn):
+        functions = self._indexes.get('functions')
+        if functions is not None:
+            functions[fn.name] = fn
+
+    def add_artifact(self, artifact_key, sha):
+        self.artifacts[artifact_key] = sha
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+DEFAULT_TTLS = {
+    'functions': 30.0,
+    'contexts': 30.0,
+    'workers': 5.0,
+}
+MAX_SIZE = 50 * 2 ** 20
+
+
+class ResponseCache(object):
+    """
+    On disk cache of successful GET responses of read-only list endpoints.
+    A response is served from disk while it is younger than the ttl of its
+    endpoint, after that it is revalidated with If-None-Match/If-Modified-Since
+    when the server sent an ETag or Last-Modified. Every entry is a pair of
+    files, the least recently stored entries are evicted once bodies exceed max_size.
+    """
+
+    def __init__(self, directory, ttls=None, max_size=MAX_SIZE):
+        """
+        :param directory: directory of cache files
+        :type ttls: dict
+        :param ttls: endpoint url template -> seconds, other endpoints are not cached
+        :param max_size: max total size of cached bodies in bytes
+        """
+        self.directory = directory
+        self.ttls = ttls if ttls is not None else dict(DEFAULT_TTLS)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+
+    def cacheable(self, method, template, kwargs):
+        return method.upper() == 'GET' and template in self.ttls and 'data' not in kwargs
+
+    @staticmethod
+    def key(url, params=None):
+        params = sorted((params or dict()).items())
+        return hashlib.sha1(json.dumps([url, params]).encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.meta', base + '.body'
+
+    def get(self, key):
+        """
+        :return: entry metadata and body or None
+        :rtype: tuple
+        """
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (IOError, OSError, ValueError):
+            return None
+        return meta, body
+
+    def is_fresh(self, template, meta):
+        return time.time() - meta['time'] < self.ttls[template]
+
+    @staticmethod
+    def conditional_headers(meta):
+        headers = dict()
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def put(self, key, template, resp):
+        """
+        :type resp: requests.Response
+        """
+        body = resp.content
+        if len(body) > self.max_size:
+            return
+        meta = dict(
+            template=template, time=time.time(), url=resp.url, encoding=resp.encoding,
+            headers=dict(resp.headers), etag=resp.headers.get('ETag'),
+            last_modified=resp.headers.get('Last-Modified')
+        )
+        meta_path, body_path = self._paths(key)
+        with self._lock:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            self._write(body_path, body, 'wb')
+            self._write(meta_path, json.dumps(meta), 'w')
+            self._evict()
+
+    def touch(self, key, meta):
+        meta['time'] = time.time()
+        with self._lock:
+            self._write(self._paths(key)[0], json.dumps(meta), 'w')
+
+    def invalidate(self, template):
+        """
+        Drops entries of the collection the template belongs to, called when it is modified.
+        :param template: url template of a modifying request
+        """
+        collection = template.split('/', 1)[0]
+        with self._lock:
+            for name in self._listdir():
+                if not name.endswith('.meta'):
+                    continue
+                entry = self.get(name[:-len('.meta')])
+                if entry is not None and entry[0]['template'].split('/', 1)[0] == collection:
+                    self._remove(name[:-len('.meta')])
+
+    @staticmethod
+    def _write(path, data, mode):
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp_path, mode) as f:
+            f.write(data)
+        os.rename(tmp_path, path)
+
+    def _listdir(self):
+        try:
+            return os.listdir(self.directory)
+        except OSError:
+            return []
+
+    def _remove(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        bodies = []
+        total = 0
+        for name in self._listdir():
+            if name.endswith('.body'):
+                st = os.stat(os.path.join(self.directory, name))
+                bodies.append((st.st_mtime, st.st_size, name[:-len('.body')]))
+                total += st.st_size
+        bodies.sort()
+        while total > self.max_size and bodies:
+            _, size, key = bodies.pop(0)
+            self._remove(key)
+            total -= size
+
+    @staticmethod
+    def to_response(meta, body):
+        """
+        :rtype: requests.Response
+        """
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.reason = 'OK'
+        resp.url = meta['url']
+        resp.encoding = meta['encoding']
+        resp.headers = CaseInsensitiveDict(meta['headers'])
+        resp._content = body
+        return resp
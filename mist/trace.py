@@ -0,0 +1,72 @@
+import json
+import math
+import threading
+from collections import OrderedDict
+
+
+def percentile(values, p):
+    """
+    Nearest-rank percentile.
+    :type values: list
+    :param values: sorted values
+    :param p: percentile in [0, 100]
+    """
+    if not values:
+        return None
+    rank = int(math.ceil(p / 100.0 * len(values)))
+    return values[max(rank, 1) - 1]
+
+
+class Tracer(object):
+    """
+    Collects per request records of http calls. Keeps only latencies per
+    endpoint in memory for the summary, raw records are optionally written
+    to a json lines file as they come.
+    """
+    header = ['METHOD', 'ENDPOINT', 'COUNT', 'ERRORS', 'SENT', 'RECEIVED', 'P50 MS', 'P95 MS', 'MAX MS']
+
+    def __init__(self, jsonl_file=None):
+        """
+        :param jsonl_file: writable text file for raw records
+        """
+        self.jsonl_file = jsonl_file
+        self.endpoints = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, method, template, status, sent, received, latency, error=None):
+        """
+        :param method: http method
+        :param template: url template of the endpoint
+        :param status: response status, None when request failed
+        :param sent: request body size in bytes
+        :param received: response body size in bytes
+        :param latency: seconds
+        :param error: exception name when request failed
+        """
+        key = (method.upper(), template)
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = dict(latencies=[], errors=0, sent=0, received=0)
+            stats['latencies'].append(latency)
+            stats['sent'] += sent
+            stats['received'] += received
+            if error is not None or status >= 400:
+                stats['errors'] += 1
+            if self.jsonl_file is not None:
+                self.jsonl_file.write(json.dumps(OrderedDict([
+                    ('method', key[0]), ('endpoint', template), ('status', status), ('error', error),
+                    ('sent', sent), ('received', received), ('latency_ms', round(latency * 1000, 3))
+                ])) + '\n')
+
+    def summary_rows(self):
+        rows = []
+        for (method, template), stats in self.endpoints.items():
+            latencies = sorted(stats['latencies'])
+            rows.append([
+                method, template, len(latencies), stats['errors'], stats['sent'], stats['received'],
+                '{:.1f}'.format(percentile(latencies, 50) * 1000),
+                '{:.1f}'.format(percentile(latencies, 95) * 1000),
+                '{:.1f}'.format(latencies[-1] * 1000)
+            ])
+        return rows
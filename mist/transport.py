@@ -0,0 +1,227 @@
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.exceptions import NewConnectionError
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+RETRY_STATUSES = frozenset([502, 503, 504])
+
+
+def is_connect_error(error):
+    """
+    :param error: exception raised by requests
+    :return: True if connection was not established, so the request was never sent
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+    return False
+
+
+class RetryPolicy(object):
+    """
+    Exponential backoff with full jitter. Idempotent methods are retried on
+    connection errors, timeouts and gateway statuses, other methods only when
+    the connection could not be established.
+    """
+
+    def __init__(self, retries=3, backoff=0.5, max_backoff=10.0, statuses=RETRY_STATUSES):
+        """
+        :param retries: max number of retries after the first attempt
+        :param backoff: base delay in seconds
+        :param max_backoff: max delay in seconds
+        :param statuses: response statuses worth retrying
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def retry_on_error(self, method, error):
+        if is_connect_error(error):
+            return True
+        return method.upper() in IDEMPOTENT_METHODS and isinstance(
+            error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+        )
+
+    def retry_on_status(self, method, status_code):
+        return method.upper() in IDEMPOTENT_METHODS and status_code in self.statuses
+
+
+class CircuitOpenException(requests.exceptions.ConnectionError):
+    pass
+
+
+class CircuitBreaker(object):
+    """
+    Opens after failure_threshold consecutive failed requests and rejects
+    requests until reset_timeout passes, then lets a trial request through.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def before_request(self, url):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.time() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenException(
+                    'Mist is unavailable after {} failed requests, not sending request to {}'.format(
+                        self.failures, url
+                    ))
+            # half-open: let this request try, the next failure opens the circuit again
+            self.opened_at = None
+            self.failures = self.failure_threshold - 1
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+
+
+class Transport(object):
+    """
+    HTTP transport shared by all MistApp calls: one keep-alive session
+    with a bounded connection pool instead of a new connection per request,
+    retries of transient failures and a circuit breaker.
+    """
+
+    def __init__(self, pool_size=10, timeout=None, retry_policy=None, circuit_breaker=None, tracer=None,
+                 cache=None):
+        """
+        :type pool_size: int
+        :param pool_size: max number of kept-alive connections per host
+        :type timeout: float
+        :param timeout: default per-request timeout in seconds, None waits forever
+        :type retry_policy: RetryPolicy
+        :param retry_policy:
+        :type circuit_breaker: CircuitBreaker
+        :param circuit_breaker:
+        :type tracer: mist.trace.Tracer
+        :param tracer: records every http call when set
+        :type cache: mist.response_cache.ResponseCache
+        :param cache: serves cacheable GET requests from disk when set
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        self.tracer = tracer
+        self.cache = cache
+        self._session = None
+
+    @classmethod
+    def create(cls, pool_size=10, timeout=None, retries=3, retry_backoff=0.5, tracer=None, cache=None):
+        return cls(pool_size, timeout, RetryPolicy(retries=retries, backoff=retry_backoff), tracer=tracer, cache=cache)
+
+    @property
+    def session(self):
+        """
+        :rtype: requests.Session
+        """
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
+
+    def request(self, method, url, template=None, **kwargs):
+        """
+        :param method: http method
+        :param url: absolute url
+        :param template: endpoint url template used in traces, url by default
+        :param kwargs: extra arguments passed to requests
+        :rtype: requests.Response
+        """
+        template = template or url
+        cache = self.cache
+        if cache is None:
+            return self._send(method, url, template, **kwargs)
+        if not cache.cacheable(method, template, kwargs):
+            resp = self._send(method, url, template, **kwargs)
+            if method.upper() != 'GET':
+                cache.invalidate(template)
+            return resp
+
+        key = cache.key(url, kwargs.get('params'))
+        entry = cache.get(key)
+        if entry is not None:
+            meta, body = entry
+            if cache.is_fresh(template, meta):
+                return cache.to_response(meta, body)
+            headers = dict(kwargs.pop('headers', None) or dict())
+            headers.update(cache.conditional_headers(meta))
+            kwargs['headers'] = headers
+        resp = self._send(method, url, template, **kwargs)
+        if resp.status_code == 304 and entry is not None:
+            cache.touch(key, meta)
+            return cache.to_response(meta, body)
+        if resp.status_code == 200:
+            cache.put(key, template, resp)
+        return resp
+
+    def _send(self, method, url, template, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            self.circuit_breaker.before_request(url)
+            started = time.time()
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._trace(method, template, None, started, e)
+                self.circuit_breaker.record_failure()
+                if attempt >= policy.retries or not policy.retry_on_error(method, e):
+                    raise
+            else:
+                self._trace(method, template, resp, started)
+                if resp.status_code not in policy.statuses:
+                    self.circuit_breaker.record_success()
+                    return resp
+                self.circuit_breaker.record_failure()
+                if attempt >= policy.retries or not policy.retry_on_status(method, resp.status_code):
+                    return resp
+                resp.close()
+
+            body = kwargs.get('data')
+            if hasattr(body, 'seek'):
+                body.seek(0)
+            time.sleep(policy.delay(attempt))
+            attempt += 1
+
+    def _trace(self, method, template, resp, started, error=None):
+        if self.tracer is None:
+            return
+        latency = time.time() - started
+        if resp is None:
+            self.tracer.record(method, template, None, 0, 0, latency, type(error).__name__)
+            return
+        body = resp.request.body
+        sent = len(body) if body is not None and hasattr(body, '__len__') else 0
+        self.tracer.record(method, template, resp.status_code, sent, len(resp.content), latency)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -0,0 +1,108 @@
+import os
+import time
+import uuid
+
+import click
+
+
+class UploadProgress(object):
+    """
+    Reports upload throughput to stderr at most once per interval
+    and once more when the upload is finished.
+    """
+
+    def __init__(self, name, interval=1.0):
+        self.name = name
+        self.interval = interval
+        self.started = None
+        self.reported = None
+
+    def __call__(self, sent, total):
+        now = time.time()
+        if self.started is None:
+            self.started = self.reported = now
+        finished = sent >= total
+        if not finished and now - self.reported < self.interval:
+            return
+        self.reported = now
+        elapsed = max(now - self.started, 1e-6)
+        click.echo('{} {}: {:.1f}/{:.1f} MB, {:.1f} MB/s'.format(
+            'Uploaded' if finished else 'Uploading',
+            self.name, sent / 2.0 ** 20, total / 2.0 ** 20, sent / 2.0 ** 20 / elapsed
+        ), err=True)
+
+
+class MultipartFileEncoder(object):
+    """
+    File-like multipart/form-data body with a single file field.
+    The file is read lazily by the http client in fixed-size chunks,
+    so memory does not depend on the file size.
+    """
+
+    def __init__(self, field_name, filename, file_path, chunk_size=2 ** 20, progress=None):
+        """
+        :param field_name: form field name
+        :param filename: file name sent to the server
+        :param file_path: local file to stream
+        :param chunk_size: max size of a single read from the file
+        :param progress: callable(sent_bytes, total_bytes)
+        """
+        self.boundary = uuid.uuid4().hex
+        self.content_type = 'multipart/form-data; boundary={}'.format(self.boundary)
+        self.chunk_size = chunk_size
+        self.progress = progress
+        head = '--{}\r\nContent-Disposition: form-data; name="{}"; filename="{}"\r\n' \
+               'Content-Type: application/octet-stream\r\n\r\n'.format(self.boundary, field_name, filename)
+        self._head = head.encode('utf-8')
+        self._tail = '\r\n--{}--\r\n'.format(self.boundary).encode('utf-8')
+        self._file_size = os.path.getsize(file_path)
+        self._file = open(file_path, 'rb')
+        self._position = 0
+        self.len = len(self._head) + self._file_size + len(self._tail)
+
+    def __len__(self):
+        return self.len
+
+    def read(self, size=-1):
+        """
+        :param size: max number of bytes, a single read never exceeds chunk_size
+        :rtype: bytes
+        """
+        if size is None or size < 0:
+            size = self.len
+        size = min(size, self.chunk_size)
+        head_end = len(self._head)
+        file_end = head_end + self._file_size
+        pos = self._position
+        if pos < head_end:
+            data = self._head[pos:pos + size]
+        elif pos < file_end:
+            data = self._file.read(min(size, file_end - pos))
+        else:
+            data = self._tail[pos - file_end:pos - file_end + size]
+        self._position += len(data)
+        if self.progress is not None and data:
+            self.progress(self._position, self.len)
+        return data
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._position
+        elif whence == 2:
+            offset += self.len
+        self._position = max(0, min(offset, self.len))
+        file_offset = self._position - len(self._head)
+        self._file.seek(max(0, min(file_offset, self._file_size)))
+        return self._position
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,118 @@
+import sys
+import time
+
+import click
+
+CLEAR_LINE = '\r\x1b[2K'
+CLEAR_BELOW = '\x1b[J'
+
+
+def merge_rows(previous, rows):
+    """
+    Keeps rows in the order they were first seen, so unchanged rows stay on
+    their lines. Rows are identified by the first column.
+    :param previous: rows of the previous snapshot
+    :param rows: rows of the current snapshot
+    :return: ordered rows and ids of added, removed or changed rows
+    :rtype: tuple
+    """
+    current = dict((row[0], row) for row in rows)
+    ordered = []
+    changed = set()
+    seen = set()
+    for row in previous:
+        row_id = row[0]
+        seen.add(row_id)
+        if row_id not in current:
+            changed.add(row_id)
+            continue
+        if current[row_id] != row:
+            changed.add(row_id)
+        ordered.append(current[row_id])
+    for row in rows:
+        if row[0] not in seen:
+            changed.add(row[0])
+            ordered.append(row)
+    return ordered, changed
+
+
+class Screen(object):
+    """
+    Redraws lines of the previous frame that differ from the new one in
+    place, with ANSI escapes on a terminal. Other outputs get whole frames
+    when anything changed.
+    """
+
+    def __init__(self, tty=None):
+        self.tty = sys.stdout.isatty() if tty is None else tty
+        self.lines = []
+        self.body = None
+
+    def update(self, lines, status=()):
+        """
+        :param lines: lines of the frame
+        :param status: lines above the frame, they alone do not make a change
+        """
+        if not self.tty:
+            if lines != self.body:
+                click.echo('\n'.join(list(status) + lines) + '\n')
+            self.body = lines
+            return
+        lines = list(status) + lines
+        out = []
+        if self.lines:
+            out.append('\x1b[{}A'.format(len(self.lines)))
+        for i, line in enumerate(lines):
+            if i < len(self.lines) and self.lines[i] == line:
+                out.append('\n')
+            else:
+                out.append(CLEAR_LINE + line + '\n')
+        if len(lines) < len(self.lines):
+            out.append(CLEAR_BELOW)
+        click.echo(''.join(out), nl=False)
+        self.lines = lines
+
+
+class Watcher(object):
+    """
+    Polls rows with one long-lived MistApp session. The interval grows while
+    snapshots do not change and falls back to the base one on a change.
+    """
+
+    def __init__(self, fetch, render, interval=2.0, max_interval=None, screen=None):
+        """
+        :param fetch: function returning table rows
+        :param render: function rendering rows into a table string
+        :param interval: base polling interval in seconds
+        :param max_interval: max polling interval, 8 base intervals by default
+        :type screen: Screen
+        """
+        self.fetch = fetch
+        self.render = render
+        self.interval = interval
+        self.max_interval = max_interval if max_interval is not None else interval * 8
+        self.screen = screen if screen is not None else Screen()
+
+    def next_interval(self, interval, changed):
+        if changed:
+            return self.interval
+        return min(interval * 1.5, self.max_interval)
+
+    def run(self, iterations=None):
+        """
+        :param iterations: number of polls, forever by default
+        """
+        rows = []
+        interval = self.interval
+        polls = 0
+        while iterations is None or polls < iterations:
+            started = time.time()
+            rows, changed = merge_rows(rows, self.fetch())
+            interval = self.next_interval(interval, changed or polls == 0)
+            status = 'Every {:.1f}s, updated at {}, {} changed'.format(
+                interval, time.strftime('%H:%M:%S'), len(changed)
+            )
+            self.screen.update(self.render(rows).splitlines(), [status, ''])
+            polls += 1
+            if iterations is None or polls < iterations:
+                time.sleep(max(0.0, interval - (time.time() - started)))
@@ -0,0 +1,100 @@
+import re
+from fnmatch import fnmatchcase
+
+from mist.executor import bounded_imap
+from mist.jobs import error_message
+
+
+def worker_context(worker):
+    """
+    :type worker: mist.models.Worker
+    :return: context the worker was started for, mist names workers <context>_<id>, None for other names
+    """
+    context, sep, worker_id = worker.name.rpartition('_')
+    if not sep or not context or not worker_id:
+        return None
+    return context
+
+
+def of_context(worker, context):
+    return worker_context(worker) == context
+
+
+class WorkerFilter(object):
+    """
+    Selects workers by name or address patterns, context and idleness.
+    A worker matches when it matches any of the patterns and all other
+    given conditions.
+    """
+
+    def __init__(self, patterns=(), regex=False, context=None, busy=None):
+        """
+        :param patterns: glob patterns matched against worker name and address
+        :param regex: treat patterns as regular expressions searched in name and address
+        :param context: context name, workers of a context are named <context>_<id>
+        :type busy: BusyWorkers
+        :param busy: running jobs, workers running any of them do not match
+        """
+        self.patterns = list(patterns)
+        self.regex = regex
+        self.context = context
+        self.busy = busy
+        if regex:
+            self._compiled = [re.compile(p) for p in self.patterns]
+
+    def _matches_pattern(self, value):
+        if self.regex:
+            return any(p.search(value) is not None for p in self._compiled)
+        return any(fnmatchcase(value, p) for p in self.patterns)
+
+    def matches(self, worker):
+        """
+        :type worker: mist.models.Worker
+        """
+        if self.patterns and not (self._matches_pattern(worker.name) or self._matches_pattern(worker.address)):
+            return False
+        if self.context is not None and not of_context(worker, self.context):
+            return False
+        if self.busy is not None and self.busy.runs_jobs(worker):
+            return False
+        return True
+
+    def apply(self, workers):
+        return [w for w in workers if self.matches(w)]
+
+
+class BusyWorkers(object):
+    """
+    Workers running started jobs. Jobs reported without a worker id keep
+    every worker of their context busy, so an idle check never selects a
+    worker that might be running a job.
+    """
+
+    def __init__(self, jobs):
+        """
+        :param jobs: iterable of started mist.models.Job
+        """
+        self.worker_ids = set()
+        self.contexts = set()
+        for job in jobs:
+            if job.worker_id:
+                self.worker_ids.add(job.worker_id)
+            else:
+                self.contexts.add(job.context)
+
+    def runs_jobs(self, worker):
+        if worker.name in self.worker_ids:
+            return True
+        return any(of_context(worker, context) for context in self.contexts)
+
+
+def kill_workers(mist_app, worker_ids, parallelism=8):
+    """
+    Stops workers concurrently, at most parallelism requests are in flight.
+    :type mist_app: mist.app.MistApp
+    :param worker_ids: iterable of worker names
+    :param parallelism: max number of concurrent requests
+    :return: generator of (worker name, error message or None) in completion order
+    """
+    for worker_id, _, error in bounded_imap(mist_app.kill_worker, worker_ids, parallelism):
+        yield worker_id, None if error is None else error_message(error)
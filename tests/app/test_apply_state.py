@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import MagicMock
+from pyhocon import ConfigTree
+
+from mist import models
+from mist.app import MistApp, calculate_sha1
+from mist.apply_state import ApplyState, deployment_digest
+
+
+class ApplyStateTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.state_path = os.path.join(self.tmp_dir, 'state', 'apply-state.json')
+        self.artifact_path = os.path.join(self.tmp_dir, 'test-job.py')
+        with open(self.artifact_path, 'w') as f:
+            f.write('print("Hello!")')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def artifact(self):
+        return models.Deployment('test', 'Artifact', ConfigTree({'file-path': self.artifact_path}), '0.0.1')
+
+    def test_digest(self):
+        ctx1 = models.Deployment('foo', 'Context', ConfigTree({'worker-mode': 'shared'}))
+        ctx2 = models.Deployment('foo', 'Context', ConfigTree({'worker-mode': 'exclusive'}))
+        self.assertEqual(deployment_digest(ctx1, calculate_sha1), deployment_digest(ctx1, calculate_sha1))
+        self.assertNotEqual(deployment_digest(ctx1, calculate_sha1), deployment_digest(ctx2, calculate_sha1))
+
+    def test_digest_depends_on_artifact_content(self):
+        before = deployment_digest(self.artifact(), calculate_sha1)
+        with open(self.artifact_path, 'w') as f:
+            f.write('print("Changed!")')
+        self.assertNotEqual(before, deployment_digest(self.artifact(), calculate_sha1))
+        missing = models.Deployment('test', 'Artifact', ConfigTree({'file-path': 'missing.py'}), '0.0.1')
+        self.assertIsNone(deployment_digest(missing, calculate_sha1))
+
+    def test_save_and_load(self):
+        depl = self.artifact()
+        state = ApplyState(self.state_path, 'localhost:2004').load()
+        self.assertFalse(state.is_applied(depl, 'digest'))
+        state.mark_applied(depl, 'digest')
+        state.save()
+        ApplyState(self.state_path, 'other:2004').load().save()
+
+        self.assertTrue(ApplyState(self.state_path, 'localhost:2004').load().is_applied(depl, 'digest'))
+        self.assertFalse(ApplyState(self.state_path, 'other:2004').load().is_applied(depl, 'digest'))
+        self.assertFalse(ApplyState(self.state_path, 'localhost:2004', force=True).load().is_applied(depl, 'digest'))
+
+    def test_update_deployments_skips_unchanged(self):
+        mist = MistApp(validate=False)
+        mist._MistApp__upload_artifact = MagicMock()
+        mist.update_context = MagicMock()
+        depls = [self.artifact(), models.Deployment('foo', 'Context', ConfigTree({'worker-mode': 'shared'}))]
+
+        mist.apply_state = ApplyState(self.state_path, 'localhost:2004').load()
+        self.assertFalse(mist.update_deployments(depls))
+        self.assertEqual(mist._MistApp__upload_artifact.call_count, 1)
+        self.assertEqual(mist.update_context.call_count, 1)
+
+        mist.apply_state = ApplyState(self.state_path, 'localhost:2004').load()
+        depls[1] = models.Deployment('foo', 'Context', ConfigTree({'worker-mode': 'exclusive'}))
+        self.assertFalse(mist.update_deployments(depls))
+        self.assertEqual(mist._MistApp__upload_artifact.call_count, 1)
+        self.assertEqual(mist.update_context.call_count, 2)
+
+        mist.apply_state = ApplyState(self.state_path, 'localhost:2004', force=True).load()
+        self.assertFalse(mist.update_deployments(depls))
+        self.assertEqual(mist._MistApp__upload_artifact.call_count, 2)
+        self.assertEqual(mist.update_context.call_count, 3)
+
+    def test_failed_entries_are_not_recorded(self):
+        mist = MistApp(validate=False)
+        mist.update_context = MagicMock(side_effect=RuntimeError('failed'))
+        depl = models.Deployment('foo', 'Context', ConfigTree({'worker-mode': 'shared'}))
+        mist.apply_state = ApplyState(self.state_path, 'localhost:2004').load()
+        self.assertTrue(mist.update_deployments([depl]))
+        state = ApplyState(self.state_path, 'localhost:2004').load()
+        self.assertFalse(state.is_applied(depl, deployment_digest(depl, calculate_sha1)))
@@ -0,0 +1,41 @@
+import itertools
+from unittest import TestCase
+
+from mist.bench import LoadGenerator, compare_rows, cycle_lines
+
+
+class LoadGeneratorTest(TestCase):
+    def test_job_count(self):
+        sent = []
+
+        def call(req):
+            sent.append(req)
+            if req % 5 == 0:
+                raise RuntimeError('boom')
+            return req % 7 != 0
+
+        report = LoadGenerator(call, itertools.count(1), concurrency=3, jobs=20).run()
+        self.assertEqual(sorted(sent), list(range(1, 21)))
+        self.assertEqual(report['jobs'], 20)
+        self.assertEqual(report['errors'], 6)
+        self.assertEqual(report['error_rate'], 0.3)
+        self.assertEqual(dict(report['error_types']), {'RuntimeError': 4, 'job failed': 2})
+        self.assertLessEqual(report['p50_ms'], report['p99_ms'])
+
+    def test_duration(self):
+        report = LoadGenerator(lambda req: True, itertools.repeat({}), concurrency=2, duration=0.05).run()
+        self.assertGreater(report['jobs'], 0)
+        self.assertGreaterEqual(report['duration_s'], 0.05)
+
+    def test_limit_is_required(self):
+        with self.assertRaises(ValueError):
+            LoadGenerator(lambda req: True, iter([]))
+
+    def test_cycle_lines(self):
+        requests = cycle_lines(['{"n": 1}\n', '\n', '{"n": 2}\n'])
+        self.assertEqual([next(requests) for _ in range(3)], [{'n': 1}, {'n': 2}, {'n': 1}])
+
+    def test_compare_rows(self):
+        rows = compare_rows({'jobs_per_sec': 150.0, 'p50_ms': 10.0, 'error_types': {}},
+                            {'jobs_per_sec': 100.0})
+        self.assertEqual(rows, [['jobs_per_sec', 150.0, 100.0, '+50.0%'], ['p50_ms', 10.0, '-', '']])
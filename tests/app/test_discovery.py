@@ -0,0 +1,68 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from unittest import TestCase
+
+from mist.discovery import GitException, IgnoreRules, changed_files, find_files
+
+
+class DiscoveryTest(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for name in ('b/20function.conf', 'b/10context.conf', 'a/00artifact.conf', 'a/nested/x.conf', 'top.conf',
+                     'a/README.md', 'target/classes/app.conf', '.git/config.conf', 'node_modules/pkg/x.conf',
+                     'tmp/skip.conf', 'build/keep.conf'):
+            self.write(name)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, name, text=''):
+        path = os.path.join(self.root, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def relative(self, paths):
+        return [os.path.relpath(p, self.root).replace(os.sep, '/') for p in paths]
+
+    def test_find_files_prunes_ignored(self):
+        self.write('.mistignore', '# local\n/tmp/\n!target/\n*.md\n')
+        found = self.relative(find_files(self.root, '*.conf', IgnoreRules.load(self.root)))
+        self.assertEqual(found, ['top.conf', 'a/00artifact.conf', 'a/nested/x.conf', 'b/10context.conf',
+                                 'b/20function.conf', 'build/keep.conf', 'target/classes/app.conf'])
+        found = self.relative(find_files(self.root, '*.conf', IgnoreRules()))
+        self.assertIn('build/keep.conf', found)
+        self.assertNotIn('target/classes/app.conf', found)
+        self.assertEqual(len(list(find_files(self.root, '*.conf'))), 10)
+
+    def test_ignore_rules(self):
+        rules = IgnoreRules(['dev/', '/a/*.conf', '!a/keep.conf'])
+        self.assertTrue(rules.ignored('x/dev', True))
+        self.assertFalse(rules.ignored('x/dev', False))
+        self.assertTrue(rules.ignored('a/y.conf', False))
+        self.assertFalse(rules.ignored('b/a/y.conf', False))
+        self.assertFalse(rules.ignored('a/keep.conf', False))
+
+    def test_changed_files(self):
+        def git(*args):
+            with open(os.devnull, 'w') as devnull:
+                subprocess.check_call(('git', '-c', 'user.name=test', '-c', 'user.email=test@example.com') + args,
+                                      cwd=self.root, stdout=devnull, stderr=devnull)
+
+        shutil.rmtree(os.path.join(self.root, '.git'))
+        git('init', '-q')
+        git('add', '-A')
+        git('commit', '-q', '-m', 'init')
+        self.write('b/20function.conf', 'model = Function\n')
+        self.write('c/10context.conf')
+        self.write('target/new.conf')
+        os.remove(os.path.join(self.root, 'top.conf'))
+
+        changed = changed_files(os.path.join(self.root, 'b'), 'HEAD', '*.conf', IgnoreRules())
+        self.assertEqual(self.relative(changed), ['b/20function.conf'])
+        changed = changed_files(self.root, 'HEAD', '*.conf', IgnoreRules())
+        self.assertEqual(sorted(self.relative(changed)), ['b/20function.conf', 'c/10context.conf'])
+        self.assertRaises(GitException, list, changed_files(self.root, 'no-such-ref', '*.conf'))
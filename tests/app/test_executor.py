@@ -0,0 +1,123 @@
+import threading
+from unittest import TestCase
+
+from mock import MagicMock, patch
+from pyhocon import ConfigTree
+
+from mist import models
+from mist.app import MistApp
+from mist.executor import DependencyExecutor, DependencyFailedException, TokenBucket, bounded_imap, check_cycles, \
+    deployment_dependencies
+
+
+class DependencyExecutorTest(TestCase):
+    def setUp(self):
+        self.deployments = [
+            models.Deployment('test-artifact', 'Artifact', ConfigTree({'file-path': 'test-path.jar'}), '0.0.1'),
+            models.Deployment('test-ctx', 'Context', ConfigTree()),
+            models.Deployment('test-fn', 'Function', ConfigTree({
+                'path': 'test-artifact_0.0.1.jar',
+                'context': 'test-ctx',
+                'class-name': 'Test'
+            })),
+            models.Deployment('other-fn', 'Function', ConfigTree({'path': 'remote.jar', 'class-name': 'Other'})),
+        ]
+
+    def test_deployment_dependencies(self):
+        deps = deployment_dependencies(self.deployments)
+        self.assertEqual(deps, {0: set(), 1: set(), 2: {0, 1}, 3: set()})
+
+    def test_check_cycles(self):
+        check_cycles({0: set(), 1: {0}})
+        with self.assertRaises(ValueError):
+            check_cycles({0: {2}, 1: {0}, 2: {1}, 3: set()})
+
+    def test_sequential_order(self):
+        calls = []
+        res = list(DependencyExecutor(1).run({0: set(), 1: {0}, 2: set(), 3: {1}}, calls.append))
+        self.assertEqual(calls, [0, 1, 2, 3])
+        self.assertEqual(res, [(0, None), (1, None), (2, None), (3, None)])
+
+    def test_failed_dependency_skips_dependents(self):
+        def fn(node):
+            if node == 0:
+                raise RuntimeError('boom')
+
+        res = dict(DependencyExecutor(1).run({0: set(), 1: {0}, 2: {1}, 3: set()}, fn))
+        self.assertIsInstance(res[0], RuntimeError)
+        self.assertIsInstance(res[1], DependencyFailedException)
+        self.assertEqual(res[1].dependency, 0)
+        self.assertIsInstance(res[2], DependencyFailedException)
+        self.assertEqual(res[2].dependency, 1)
+        self.assertIsNone(res[3])
+
+    def test_parallel_run(self):
+        barrier = threading.Barrier(3) if hasattr(threading, 'Barrier') else None
+        seen = []
+
+        def fn(node):
+            if barrier is not None and node < 3:
+                barrier.wait(timeout=5)
+            seen.append(node)
+
+        res = dict(DependencyExecutor(3).run({0: set(), 1: set(), 2: set(), 3: {0, 1, 2}}, fn))
+        self.assertEqual(sorted(res.keys()), [0, 1, 2, 3])
+        self.assertTrue(all(e is None for e in res.values()))
+        self.assertEqual(seen[-1], 3)
+
+    def test_update_deployments_skips_dependents(self):
+        mist = MistApp(validate=False, parallelism=2)
+        mist._MistApp__upload_artifact = MagicMock(side_effect=RuntimeError('upload failed'))
+        mist.update_context = MagicMock()
+        mist.update_function = MagicMock()
+
+        with_errors = mist.update_deployments(self.deployments)
+        self.assertTrue(with_errors)
+        self.assertEqual(mist.update_context.call_count, 1)
+        called_fns = [c[0][0].name for c in mist.update_function.call_args_list]
+        self.assertEqual(called_fns, ['other-fn'])
+
+
+class BoundedImapTest(TestCase):
+    def test_items_are_pulled_lazily(self):
+        taken = []
+
+        def items():
+            for i in range(100):
+                taken.append(i)
+                yield i
+
+        def fn(i):
+            if i == 7:
+                raise ValueError(i)
+            return i * 2
+
+        max_ahead = 0
+        results = dict()
+        for item, result, error in bounded_imap(fn, items(), parallelism=4, max_pending=6):
+            results[item] = error if error is not None else result
+            max_ahead = max(max_ahead, len(taken) - len(results))
+        self.assertEqual(len(results), 100)
+        self.assertEqual(results[3], 6)
+        self.assertIsInstance(results[7], ValueError)
+        self.assertLessEqual(max_ahead, 5)
+
+    def test_inline(self):
+        self.assertEqual([r[1] for r in bounded_imap(abs, [-1, -2])], [1, 2])
+
+
+class TokenBucketTest(TestCase):
+    @patch('mist.executor.time.sleep')
+    @patch('mist.executor.time.time', return_value=100.0)
+    def test_acquire(self, now, sleep):
+        bucket = TokenBucket(rate=2, capacity=2)
+        bucket.acquire()
+        bucket.acquire()
+        sleep.assert_not_called()
+        bucket.acquire()
+        sleep.assert_called_once_with(0.5)
+        bucket.acquire()
+        self.assertEqual(sleep.call_args[0][0], 1.0)
+        now.return_value = 102.0
+        bucket.acquire()
+        self.assertEqual(sleep.call_count, 2)
@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from mist.generator import RequestGenerator
+
+SCHEMA = {
+    'numbers': {'type': 'MList', 'args': [{'type': 'MInt'}]},
+    'multiplier': {'type': 'MOption', 'args': [{'type': 'MDouble'}]},
+    'name': {'type': 'MString'},
+    'options': {'type': 'MMap', 'args': [{'type': 'MString'}, {'type': 'MAny'}]},
+    'point': {'type': 'MObj', 'fields': {'x': {'type': 'MDouble'}, 'y': {'type': 'MUnknown'}}},
+}
+
+
+class RequestGeneratorTest(TestCase):
+    def test_default_shape(self):
+        req = RequestGenerator(SCHEMA).generate()
+        self.assertEqual(sorted(req.keys()), ['multiplier', 'name', 'numbers', 'options', 'point'])
+        self.assertEqual(len(req['numbers']), 1)
+        self.assertTrue(1 <= req['numbers'][0] <= 10)
+        self.assertTrue(0.0 <= req['multiplier'] < 1.0)
+        self.assertEqual(req['name'], 'string')
+        self.assertEqual(req['options'], {'string': {}})
+        self.assertIsNone(req['point']['y'])
+
+    def test_seeded_output_is_reproducible(self):
+        first = RequestGenerator(SCHEMA, seed=7, min_size=0, max_size=5, string_length=6).generate_batch(50)
+        second = RequestGenerator(SCHEMA, seed=7, min_size=0, max_size=5, string_length=6)
+        self.assertEqual(first, [second.generate()] + second.generate_batch(49))
+        self.assertNotEqual(first, RequestGenerator(SCHEMA, seed=8, min_size=0, max_size=5).generate_batch(50))
+
+    def test_sizes_and_ranges(self):
+        generator = RequestGenerator(SCHEMA, seed=1, min_size=2, max_size=4, int_range=(-3, 3),
+                                     double_range=(10.0, 20.0), string_length=8, none_rate=0.5)
+        requests = generator.generate_batch(200)
+        sizes = set(len(r['numbers']) for r in requests)
+        self.assertEqual(sizes, {2, 3, 4})
+        numbers = set(n for r in requests for n in r['numbers'])
+        self.assertEqual(numbers, set(range(-3, 4)))
+        multipliers = [r['multiplier'] for r in requests]
+        self.assertIn(None, multipliers)
+        self.assertTrue(all(10.0 <= m < 20.0 for m in multipliers if m is not None))
+        self.assertTrue(all(len(r['name']) == 8 for r in requests))
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            RequestGenerator(SCHEMA, min_size=3, max_size=1)
@@ -0,0 +1,60 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import patch
+
+from mist import hashing
+from mist.hashing import HashCache, sha1_file
+
+
+class HashingTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.files = []
+        for i in range(4):
+            path = os.path.join(self.tmp_dir, 'job-{}.jar'.format(i))
+            with open(path, 'wb') as f:
+                f.write(os.urandom(3 * 2 ** 20 + i))
+            self.files.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def expected(self, path):
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def test_sha1_file(self):
+        self.assertEqual(sha1_file(self.files[0]), self.expected(self.files[0]))
+        self.assertEqual(sha1_file(self.files[1], block_size=1000), self.expected(self.files[1]))
+
+    def test_cache_hit(self):
+        cache = HashCache()
+        with patch.object(hashing, 'sha1_file', wraps=hashing.sha1_file) as sha1:
+            self.assertEqual(cache.sha1(self.files[0]), self.expected(self.files[0]))
+            self.assertEqual(cache.sha1(self.files[0]), self.expected(self.files[0]))
+            self.assertEqual(sha1.call_count, 1)
+
+            with open(self.files[0], 'ab') as f:
+                f.write(b'changed')
+            self.assertEqual(cache.sha1(self.files[0]), self.expected(self.files[0]))
+            self.assertEqual(sha1.call_count, 2)
+
+    def test_persisted_cache(self):
+        cache_path = os.path.join(self.tmp_dir, 'cache', 'sha1-cache.json')
+        cache = HashCache(cache_path).load()
+        cache.sha1_many(self.files)
+        cache.save()
+
+        with patch.object(hashing, 'sha1_file') as sha1:
+            warm = HashCache(cache_path).load()
+            res = warm.sha1_many(self.files)
+            self.assertEqual(sha1.call_count, 0)
+        self.assertEqual(res, dict((p, self.expected(p)) for p in self.files))
+
+    def test_sha1_many(self):
+        res = HashCache(workers=3).sha1_many(self.files + self.files[:1])
+        self.assertEqual(res, dict((p, self.expected(p)) for p in self.files))
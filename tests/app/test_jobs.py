@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+import requests_mock
+from mock import MagicMock, patch
+
+from mist.app import MistApp
+from mist.jobs import JobWaiter, WaitTimeoutException, cancel_jobs, job_result, submit_jobs
+
+
+@patch('mist.jobs.time.sleep')
+class JobWaiterTest(TestCase):
+    MIST_APP_URL = 'http://localhost:2004/v2/api/'
+
+    @requests_mock.Mocker()
+    def test_submit_and_wait(self, sleep, m):
+        m.register_uri('POST', self.MIST_APP_URL + 'functions/simple/jobs', text='{"id": "job-1"}')
+        m.register_uri('GET', self.MIST_APP_URL + 'jobs/job-1', [
+            {'text': '{"jobId": "job-1", "status": "queued"}'},
+            {'text': '{"jobId": "job-1", "status": "started"}'},
+            {'text': '{"jobId": "job-1", "status": "started"}'},
+            {'text': '{"jobId": "job-1", "status": "started"}'},
+            {'text': '{"jobId": "job-1", "status": "finished", "jobResult": 3}'},
+        ])
+        mist = MistApp()
+        job_id = mist.submit_job('simple', '{"n": 1}')
+        self.assertEqual(job_id, 'job-1')
+        self.assertNotIn('force', m.request_history[0].qs)
+
+        changes = []
+        waiter = JobWaiter(mist, interval=1, max_interval=3, on_change=lambda job: changes.append(job['status']))
+        jobs = list(waiter.wait([job_id]))
+        self.assertEqual(job_result(jobs[0]), dict(success=True, payload=3, errors=[]))
+        self.assertEqual(changes, ['queued', 'started', 'finished'])
+        delays = [round(c[0][0]) for c in sleep.call_args_list]
+        self.assertEqual(delays, [1, 1, 2, 3])
+
+    def test_many_jobs_complete_in_any_order(self, sleep):
+        mist = MistApp()
+        polls = {'slow': iter(['started', 'started', 'finished']), 'fast': iter(['failed'])}
+        mist.get_job = MagicMock(side_effect=lambda job_id: dict(jobId=job_id, status=next(polls[job_id])))
+        jobs = list(JobWaiter(mist).wait(['slow', 'fast']))
+        self.assertEqual([job['jobId'] for job in jobs], ['fast', 'slow'])
+        self.assertFalse(job_result(jobs[0])['success'])
+
+    def test_timeout(self, sleep):
+        mist = MistApp()
+        mist.get_job = MagicMock(return_value=dict(jobId='job-1', status='started'))
+        with self.assertRaises(WaitTimeoutException):
+            list(JobWaiter(mist, interval=1, timeout=0).wait(['job-1']))
+        self.assertEqual(mist.get_job.call_count, 1)
+
+
+class SubmitJobsTest(TestCase):
+    MIST_APP_URL = 'http://localhost:2004/v2/api/'
+
+    @requests_mock.Mocker()
+    def test_submit_jobs(self, m):
+        m.register_uri('POST', self.MIST_APP_URL + 'functions/simple/jobs', [
+            {'text': '{"id": "job-1"}'}, {'text': '{"id": "job-2"}'}, {'status_code': 400, 'text': 'bad request'},
+        ])
+        lines = ['{"n": 1}\n', '\n', '{"n": 2}\n', 'not json\n', '{"n": 3}\n']
+        results = sorted(submit_jobs(MistApp(), 'simple', lines, parallelism=1), key=lambda r: r['line'])
+        self.assertEqual([r['line'] for r in results], [1, 3, 4, 5])
+        self.assertEqual([r['jobId'] for r in results], ['job-1', 'job-2', None, None])
+        self.assertEqual([r['status'] for r in results], ['submitted', 'submitted', 'failed', 'failed'])
+        self.assertEqual(results[3]['error'], '400 bad request')
+        self.assertIsNotNone(results[0]['latency_ms'])
+        self.assertEqual(m.call_count, 3)
+        self.assertEqual(m.request_history[1].json(), {'n': 2})
+
+    @requests_mock.Mocker()
+    def test_cancel_jobs(self, m):
+        m.register_uri('DELETE', self.MIST_APP_URL + 'jobs/job-1', text='')
+        m.register_uri('DELETE', self.MIST_APP_URL + 'jobs/job-2', status_code=404, text='not found')
+        results = dict(cancel_jobs(MistApp(), ['job-1', 'job-2'], parallelism=2))
+        self.assertEqual(results, {'job-1': None, 'job-2': '404 not found'})
@@ -7,7 +7,7 @@ from mock import MagicMock
 from pyhocon import ConfigTree, ConfigFactory
 
 from mist import models
-from mist.app import MistApp
+from mist.app import MistApp, calculate_sha1
 from mist.app import parse_spark_config
 
 
@@ -102,6 +102,41 @@ class MistAppTest(TestCase):
         self.assertEqual(jobs[1].job_id, 'test2')
         self.assertEqual(jobs[1].status, 'finished')
 
+    def test_iter_jobs_pages(self, m):
+        mist = MistApp()
+        jobs = [dict(jobId=str(i), function='foo', context='bar', source='http', status='finished')
+                for i in range(25)]
+
+        def page(request, context):
+            offset, limit = int(request.qs['offset'][0]), int(request.qs['limit'][0])
+            return json.dumps(jobs[offset:offset + limit])
+
+        m.register_uri('GET', self.MIST_APP_URL + 'jobs', text=page)
+        self.assertEqual([j.job_id for j in mist.iter_jobs('finished', page_size=10)], [str(i) for i in range(25)])
+        self.assertEqual(m.call_count, 3)
+        self.assertEqual(m.last_request.qs['status'], ['finished'])
+
+        result = list(mist.iter_jobs('finished', limit=12, offset=5, page_size=10))
+        self.assertEqual([j.job_id for j in result], [str(i) for i in range(5, 17)])
+        self.assertEqual([r.qs['limit'] for r in m.request_history[-2:]], [['10'], ['2']])
+
+    def test_iter_jobs_without_server_pagination(self, m):
+        mist = MistApp()
+        jobs = [dict(jobId=str(i), function='foo', context='bar', source='http', status='finished')
+                for i in range(25)]
+        m.register_uri('GET', self.MIST_APP_URL + 'jobs', text=json.dumps(jobs))
+        self.assertEqual(len(list(mist.iter_jobs('finished', page_size=10))), 25)
+        self.assertEqual(len(list(mist.iter_jobs('finished', limit=12, page_size=10))), 12)
+        self.assertEqual(m.call_count, 2)
+
+    def test_iter_jobs_without_server_pagination_full_page(self, m):
+        mist = MistApp()
+        jobs = [dict(jobId=str(i), function='foo', context='bar', source='http', status='finished')
+                for i in range(3)]
+        m.register_uri('GET', self.MIST_APP_URL + 'jobs', text=json.dumps(jobs))
+        self.assertEqual([j.job_id for j in mist.iter_jobs('finished', page_size=3)], ['0', '1', '2'])
+        self.assertEqual(m.call_count, 2)
+
     def test_contexts(self, m):
         mist = MistApp()
         m.register_uri('GET', self.MIST_APP_URL + 'contexts',
@@ -373,6 +408,31 @@ class MistAppTest(TestCase):
         with self.assertRaises(ValueError):
             mist._validate_function(fn3)
 
+    def test_upload_identical_artifact_is_skipped(self, m):
+        sha = calculate_sha1(self.test_job_path)
+        m.register_uri('GET', self.MIST_APP_URL + 'artifacts/test-job_0.0.1.py/sha', text=sha.upper() + '\n')
+        m.register_uri('POST', self.MIST_APP_URL + 'artifacts', text='test-job_0.0.1.py')
+        mist = MistApp()
+        artifact = models.Artifact('test-job', self.test_job_path).with_version('0.0.1')
+        mist._validate_artifact(artifact)
+        res = mist._MistApp__upload_artifact(artifact)
+        self.assertEqual(res.file_path, 'test-job_0.0.1.py')
+        self.assertFalse(any(r.method == 'POST' for r in m.request_history))
+
+    def test_upload_new_artifact(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'artifacts/test-job.py/sha', status_code=404)
+        m.register_uri('POST', self.MIST_APP_URL + 'artifacts', text='test-job.py')
+        mist = MistApp()
+        res = mist._MistApp__upload_artifact(models.Artifact('test-job', self.test_job_path))
+        self.assertEqual(res.file_path, 'test-job.py')
+        self.assertEqual(m.last_request.method, 'POST')
+
+    def test_validate_artifact_with_different_content(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'artifacts/test-job.py/sha', text='OTHER_SHA')
+        mist = MistApp()
+        with self.assertRaises(ValueError):
+            mist._validate_artifact(models.Artifact('test-job', self.test_job_path))
+
     def test_get_status_return_smth(self, m):
         m.register_uri('GET', self.MIST_APP_URL + 'status', text="""
         {
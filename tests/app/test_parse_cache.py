@@ -0,0 +1,103 @@
+import datetime
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import MagicMock, patch
+
+from mist.app import MistApp, parse_spark_config
+from mist.parse_cache import ParseCache
+
+
+EXAMPLE_CONTEXT = os.path.join(os.path.dirname(__file__), '..', '..', 'example', 'simple-context', '10context.conf')
+
+
+class ParseCacheTest(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.spark_conf = self.write('spark.conf', 'spark-conf { spark.driver.memory = "512m" }\n')
+        self.context_conf = self.write('ctx/10context.conf', '''
+model = Context
+include "../spark.conf"
+data {
+    streaming-duration = 1s
+    run-options = ${?MIST_TEST_RUN_OPTIONS}
+    spark-conf = ${spark-conf}
+}
+''')
+        self.function_conf = self.write('fn/20function.conf', '''
+model = Function
+data { path = job.jar, class-name = "Job$", context = ctx }
+''')
+        self.cache_path = os.path.join(self.root, 'cache', 'parse-cache.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def parse(self, paths):
+        mist_app = MistApp()
+        mist_app.parse_cache = ParseCache(self.cache_path, '1.0').load()
+        result = list(mist_app.parse_deployments(paths, processes=1))
+        mist_app.parse_cache.save()
+        return result
+
+    def test_persisted_entries_are_not_parsed_again(self):
+        parsed = self.parse([self.context_conf, self.function_conf])
+        with patch.object(MistApp, 'parse_deployment') as parse_deployment:
+            cached = self.parse([self.context_conf, self.function_conf])
+        parse_deployment.assert_not_called()
+        self.assertEqual([(o, d.name, d.data) for o, d in cached], [(o, d.name, d.data) for o, d in parsed])
+        self.assertEqual(cached[0][1].data['streaming-duration'], datetime.timedelta(seconds=1))
+        self.assertEqual(cached[0][1].data.get_string('spark-conf.spark.driver.memory'), '512m')
+
+    def test_include_and_environment_changes_invalidate_entries(self):
+        self.parse([self.context_conf, self.function_conf])
+        self.write('spark.conf', 'spark-conf { spark.driver.memory = "2g" }\n')
+        with patch.dict(os.environ, {'MIST_TEST_RUN_OPTIONS': '-v'}):
+            cache = ParseCache(self.cache_path, '1.0').load()
+            self.assertIsNone(cache.get(self.context_conf))
+            self.assertIsNotNone(cache.get(self.function_conf))
+            _, context = self.parse([self.context_conf])[0]
+        self.assertEqual(context.data.get_string('spark-conf.spark.driver.memory'), '2g')
+        self.assertEqual(context.data['run-options'], '-v')
+
+    def test_other_version_is_dropped(self):
+        self.parse([self.function_conf])
+        self.assertEqual(ParseCache(self.cache_path, '2.0').load().entries, dict())
+
+    def test_pool_keeps_order(self):
+        mist_app = MistApp()
+        mist_app.INLINE_PARSES = 1
+        mist_app.parse_deployment = MagicMock(side_effect=MistApp.parse_deployment)
+        paths = [self.function_conf, self.context_conf, self.function_conf]
+        result = list(mist_app.parse_deployments(paths, processes=2))
+        self.assertEqual([d.model_type for _, d in result], ['Function', 'Context', 'Function'])
+        self.assertEqual(mist_app.parse_deployment.call_count, 1)
+        self.assertEqual(result[1][1].data['streaming-duration'], datetime.timedelta(seconds=1))
+
+    def test_quoted_keys_with_dots(self):
+        example = self.write('simple-context/10context.conf', open(EXAMPLE_CONTEXT).read())
+        spark_conf = lambda result: parse_spark_config(result[0][1].data.get_config('spark-conf'), '')
+        expected = spark_conf([MistApp.parse_deployment(example)])
+        self.assertEqual(expected['spark.speculation'], 'true')
+        self.assertEqual(expected['spark.speculation.multiplier'], '0.1')
+
+        self.parse([example])
+        with patch.object(MistApp, 'parse_deployment') as parse_deployment:
+            cached = self.parse([example])
+        parse_deployment.assert_not_called()
+        self.assertEqual(spark_conf(cached), expected)
+
+        mist_app = MistApp()
+        mist_app.INLINE_PARSES = 0
+        pooled = list(mist_app.parse_deployments([example], processes=2))
+        self.assertEqual(spark_conf(pooled), expected)
@@ -0,0 +1,68 @@
+import datetime
+import json
+from unittest import TestCase
+
+import requests_mock
+
+from mist.app import MistApp
+from mist.models import Job
+from mist.query import JobQuery, parse_time, query_jobs
+
+NOW = datetime.datetime(2018, 5, 30, 12, 0)
+
+
+def job(job_id, function='foo', context='default', source='http', minutes_ago=None):
+    start_time = NOW - datetime.timedelta(minutes=minutes_ago) if minutes_ago is not None else None
+    return Job(job_id, function, context, source, 'finished', start_time=start_time)
+
+
+class ParseTimeTest(TestCase):
+    def test_relative(self):
+        self.assertEqual(parse_time('30m', NOW), datetime.datetime(2018, 5, 30, 11, 30))
+        self.assertEqual(parse_time('1d', NOW), datetime.datetime(2018, 5, 29, 12, 0))
+
+    def test_absolute(self):
+        self.assertEqual(parse_time('2018-05-30 10:15'), datetime.datetime(2018, 5, 30, 10, 15))
+        self.assertEqual(parse_time('2018-05-30'), datetime.datetime(2018, 5, 30))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, parse_time, 'yesterday')
+
+
+class JobQueryTest(TestCase):
+    def test_matches(self):
+        query = JobQuery(function='spark-*', context='default', since=NOW - datetime.timedelta(hours=1), until=NOW)
+        self.assertTrue(query.matches(job('1', 'spark-pi', minutes_ago=10)))
+        self.assertFalse(query.matches(job('2', 'hive', minutes_ago=10)))
+        self.assertFalse(query.matches(job('3', 'spark-pi', context='streaming', minutes_ago=10)))
+        self.assertFalse(query.matches(job('4', 'spark-pi', minutes_ago=90)))
+        self.assertFalse(query.matches(job('5', 'spark-pi')))
+
+    def test_sort_with_limit(self):
+        jobs = [job('a', minutes_ago=5), job('b'), job('c', minutes_ago=1), job('d', minutes_ago=9)]
+        ids = lambda query: [j.job_id for j in query.apply(iter(jobs))]
+        self.assertEqual(ids(JobQuery(sort='-start_time', limit=2)), ['c', 'a'])
+        self.assertEqual(ids(JobQuery(sort='start_time')), ['d', 'a', 'c', 'b'])
+        self.assertEqual(ids(JobQuery(sort='-start_time')), ['c', 'a', 'd', 'b'])
+        self.assertEqual(ids(JobQuery(limit=3)), ['a', 'b', 'c'])
+
+    def test_unknown_sort_key(self):
+        self.assertRaises(ValueError, JobQuery, sort='name')
+
+    def test_server_pushdown(self):
+        self.assertEqual(JobQuery(function='foo', limit=5).server_function, 'foo')
+        self.assertEqual(JobQuery(function='foo', limit=5).server_limit, 5)
+        self.assertIsNone(JobQuery(function='foo*', limit=5).server_function)
+        self.assertIsNone(JobQuery(function='foo*', limit=5).server_limit)
+        self.assertIsNone(JobQuery(source='cli', limit=5).server_limit)
+        self.assertIsNone(JobQuery(sort='job_id', limit=5).server_limit)
+
+    @requests_mock.Mocker()
+    def test_query_jobs(self, m):
+        jobs = [dict(jobId=str(i), function='foo', context='ctx-{}'.format(i % 2), source='http', status='finished')
+                for i in range(10)]
+        m.register_uri('GET', 'http://localhost:2004/v2/api/functions/foo/jobs', text=json.dumps(jobs))
+        result = query_jobs(MistApp(), 'finished', JobQuery(function='foo', context='ctx-1', limit=3))
+        self.assertEqual([j.job_id for j in result], ['1', '3', '5'])
+        self.assertEqual(m.last_request.qs['status'], ['finished'])
+        self.assertEqual(m.last_request.qs['limit'], ['100'])
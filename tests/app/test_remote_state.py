@@ -0,0 +1,74 @@
+from unittest import TestCase
+
+import requests_mock
+from pyhocon import ConfigTree
+
+from mist import models
+from mist.app import MistApp
+from mist.remote_state import RemoteState
+
+
+@requests_mock.Mocker()
+class RemoteStateTest(TestCase):
+    MIST_APP_URL = 'http://localhost:2004/v2/api/'
+
+    def test_contexts_fetched_once(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'contexts', text='[{"name": "foo"}, {"name": "bar"}]')
+        m.register_uri('GET', self.MIST_APP_URL + 'contexts/baz', status_code=404)
+        state = RemoteState(MistApp())
+        self.assertTrue(state.has_context('foo'))
+        self.assertTrue(state.has_context('bar'))
+        self.assertFalse(state.has_context('baz'))
+        self.assertEqual(m.call_count, 2)
+
+    def test_context_created_after_snapshot(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'contexts', text='[]')
+        m.register_uri('GET', self.MIST_APP_URL + 'contexts/foo', text='{"name": "foo"}')
+        state = RemoteState(MistApp())
+        self.assertTrue(state.has_context('foo'))
+        self.assertTrue(state.has_context('foo'))
+        self.assertEqual(m.call_count, 2)
+
+    def test_functions_fallback(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'functions', status_code=500)
+        m.register_uri('GET', self.MIST_APP_URL + 'functions/foo', text='{"name": "foo"}')
+        m.register_uri('GET', self.MIST_APP_URL + 'functions/bar', status_code=404)
+        state = RemoteState(MistApp())
+        self.assertTrue(state.has_function('foo'))
+        self.assertFalse(state.has_function('bar'))
+
+    def test_artifact_sha_memoized(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'artifacts/test.jar/sha', text='SOME_SHA')
+        state = RemoteState(MistApp())
+        self.assertEqual(state.artifact_sha('test.jar'), 'SOME_SHA')
+        self.assertEqual(state.artifact_sha('test.jar'), 'SOME_SHA')
+        state.add_artifact('other.jar', 'OTHER_SHA')
+        self.assertEqual(state.artifact_sha('other.jar'), 'OTHER_SHA')
+        self.assertEqual(m.call_count, 1)
+
+    def test_update_deployments_uses_snapshot(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'contexts', text='[{"name": "foo"}]')
+        m.register_uri('GET', self.MIST_APP_URL + 'functions', text="""[
+            {"name": "fn1", "className": "Test", "path": "test.jar", "defaultContext": "foo"}
+        ]""")
+        m.register_uri('GET', self.MIST_APP_URL + 'artifacts/test.jar/sha', text='SOME_SHA')
+        m.register_uri('PUT', self.MIST_APP_URL + 'functions',
+                       text='{"name": "fn1", "className": "Test", "path": "test.jar", "defaultContext": "foo"}')
+        m.register_uri('POST', self.MIST_APP_URL + 'functions',
+                       text='{"name": "fn2", "className": "Test", "path": "test.jar", "defaultContext": "foo"}')
+        data = {'class-name': 'Test', 'context': 'foo', 'path': 'test.jar'}
+        depls = [
+            models.Deployment('fn1', 'Function', ConfigTree(data)),
+            models.Deployment('fn2', 'Function', ConfigTree(data)),
+        ]
+        mist = MistApp()
+        self.assertFalse(mist.update_deployments(depls))
+        methods = [(r.method, r.path) for r in m.request_history]
+        self.assertEqual(methods, [
+            ('GET', '/v2/api/contexts'),
+            ('GET', '/v2/api/artifacts/test.jar/sha'),
+            ('GET', '/v2/api/functions'),
+            ('PUT', '/v2/api/functions'),
+            ('POST', '/v2/api/functions'),
+        ])
+        self.assertIsNone(mist.remote_state)
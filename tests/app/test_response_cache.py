@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import requests_mock
+
+from mist.app import MistApp
+from mist.response_cache import ResponseCache
+from mist.transport import Transport
+
+
+@requests_mock.Mocker()
+class ResponseCacheTest(TestCase):
+    MIST_APP_URL = 'http://localhost:2004/v2/api/'
+    FUNCTIONS = '[{"name": "simple", "path": "test-path.py", "className": "Test", ' \
+                '"defaultContext": {"name": "foo"}, "execute": {}}]'
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = ResponseCache(self.tmp_dir)
+        self.mist = MistApp(transport=Transport(cache=self.cache))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_fresh_response_is_served_from_disk(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'functions', text=self.FUNCTIONS)
+        self.assertEqual(self.mist.functions()[0].name, 'simple')
+        self.assertEqual(self.mist.functions()[0].name, 'simple')
+        self.assertEqual(m.call_count, 1)
+
+        # another process shares the cache
+        other = MistApp(transport=Transport(cache=ResponseCache(self.tmp_dir)))
+        self.assertEqual(other.functions()[0].name, 'simple')
+        self.assertEqual(m.call_count, 1)
+
+    def test_stale_response_is_revalidated(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'functions', text=self.FUNCTIONS, headers={'ETag': '"v1"'})
+        self.cache.ttls['functions'] = 0
+        self.mist.functions()
+        m.register_uri('GET', self.MIST_APP_URL + 'functions', status_code=304)
+        self.assertEqual(self.mist.functions()[0].name, 'simple')
+        self.assertEqual(m.last_request.headers['If-None-Match'], '"v1"')
+
+    def test_not_cached_endpoints(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'jobs', text='[]')
+        self.mist.jobs('started')
+        self.mist.jobs('started')
+        self.assertEqual(m.call_count, 2)
+
+    def test_modification_invalidates_collection(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'workers', text='[]')
+        m.register_uri('DELETE', self.MIST_APP_URL + 'workers/w1', text='')
+        self.mist.workers()
+        self.mist.kill_worker('w1')
+        self.mist.workers()
+        self.assertEqual(m.call_count, 3)
+
+    def test_eviction_by_size(self, m):
+        self.cache.max_size = len(self.FUNCTIONS) + 1
+        m.register_uri('GET', self.MIST_APP_URL + 'functions', text=self.FUNCTIONS)
+        m.register_uri('GET', self.MIST_APP_URL + 'contexts', text='[]')
+        self.mist.functions()
+        self.mist.contexts()
+        bodies = [name for name in os.listdir(self.tmp_dir) if name.endswith('.body')]
+        self.assertEqual(len(bodies), 1)
@@ -0,0 +1,65 @@
+import io
+import json
+from unittest import TestCase
+
+import requests
+import requests_mock
+from mock import patch
+
+from mist.app import MistApp
+from mist.trace import Tracer, percentile
+from mist.transport import Transport, RetryPolicy
+
+
+class TracerTest(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([7], 0), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summary(self):
+        tracer = Tracer()
+        for i in range(1, 21):
+            tracer.record('get', 'functions/{}', 200, 0, 10, i / 1000.0)
+        tracer.record('post', 'functions', None, 0, 0, 0.5, 'ConnectionError')
+        rows = tracer.summary_rows()
+        self.assertEqual(rows[0], ['GET', 'functions/{}', 20, 0, 0, 200, '10.0', '19.0', '20.0'])
+        self.assertEqual(rows[1][:4], ['POST', 'functions', 1, 1])
+
+    def test_jsonl(self):
+        out = io.StringIO()
+        tracer = Tracer(out)
+        tracer.record('get', 'workers', 200, 0, 57, 0.0051)
+        record = json.loads(out.getvalue())
+        self.assertEqual(record['method'], 'GET')
+        self.assertEqual(record['endpoint'], 'workers')
+        self.assertEqual(record['received'], 57)
+        self.assertEqual(record['latency_ms'], 5.1)
+
+
+@requests_mock.Mocker()
+class TransportTraceTest(TestCase):
+    MIST_APP_URL = 'http://localhost:2004/v2/api/'
+
+    def test_mist_app_calls_are_traced(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'functions/foo', text='{"name": "foo"}')
+        m.register_uri('POST', self.MIST_APP_URL + 'contexts', text='{"name": "bar"}')
+        tracer = Tracer()
+        mist = MistApp(transport=Transport(tracer=tracer))
+        mist.get_function_json('foo')
+        mist._request('post', 'contexts', json={'name': 'bar'})
+        rows = tracer.summary_rows()
+        self.assertEqual(rows[0][:6], ['GET', 'functions/{}', 1, 0, 0, 15])
+        self.assertEqual(rows[1][:6], ['POST', 'contexts', 1, 0, 15, 15])
+
+    @patch('mist.transport.time.sleep')
+    def test_retries_are_traced(self, m, sleep):
+        m.register_uri('GET', self.MIST_APP_URL + 'workers', exc=requests.exceptions.ConnectionError)
+        tracer = Tracer()
+        transport = Transport(tracer=tracer, retry_policy=RetryPolicy(retries=2))
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            transport.request('get', self.MIST_APP_URL + 'workers', template='workers')
+        self.assertEqual(tracer.summary_rows()[0][:4], ['GET', 'workers', 3, 3])
@@ -0,0 +1,102 @@
+from unittest import TestCase
+
+import requests
+import requests_mock
+from mock import MagicMock, patch
+
+from mist.app import MistApp
+from mist.transport import Transport, RetryPolicy, CircuitBreaker, CircuitOpenException
+
+
+@requests_mock.Mocker()
+class TransportTest(TestCase):
+    MIST_APP_URL = 'http://localhost:2004/v2/api/'
+
+    def test_session_is_reused(self, m):
+        transport = Transport()
+        self.assertIs(transport.session, transport.session)
+
+    def test_pool_size(self, m):
+        transport = Transport(pool_size=3)
+        adapter = transport.session.get_adapter('http://localhost:2004')
+        self.assertEqual(adapter._pool_maxsize, 3)
+
+    def test_default_timeout(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'status', text='{}')
+        transport = Transport(timeout=1.5)
+        transport.request('get', self.MIST_APP_URL + 'status')
+        self.assertEqual(m.last_request.timeout, 1.5)
+        transport.request('get', self.MIST_APP_URL + 'status', timeout=3)
+        self.assertEqual(m.last_request.timeout, 3)
+
+    def test_close(self, m):
+        transport = Transport()
+        session = transport.session
+        transport.close()
+        self.assertIsNot(session, transport.session)
+
+    def test_mist_app_uses_transport(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'functions/with%2Fslash', status_code=404)
+        transport = Transport()
+        transport.request = MagicMock(wraps=transport.request)
+        mist = MistApp(transport=transport)
+        self.assertIsNone(mist.get_function_json('with/slash'))
+        transport.request.assert_called_once_with('get', self.MIST_APP_URL + 'functions/with%2Fslash',
+                                                  template='functions/{}')
+
+
+@requests_mock.Mocker()
+@patch('mist.transport.time.sleep')
+class TransportRetryTest(TestCase):
+    URL = 'http://localhost:2004/v2/api/functions'
+
+    def test_retry_idempotent_on_gateway_error(self, m, sleep):
+        m.register_uri('GET', self.URL, [{'status_code': 502}, {'status_code': 503}, {'text': '[]'}])
+        resp = Transport().request('get', self.URL)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(m.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_retries_exhausted(self, m, sleep):
+        m.register_uri('GET', self.URL, status_code=502)
+        resp = Transport(retry_policy=RetryPolicy(retries=2)).request('get', self.URL)
+        self.assertEqual(resp.status_code, 502)
+        self.assertEqual(m.call_count, 3)
+
+    def test_post_is_not_retried_on_gateway_error(self, m, sleep):
+        m.register_uri('POST', self.URL, [{'status_code': 502}, {'text': '{}'}])
+        resp = Transport().request('post', self.URL)
+        self.assertEqual(resp.status_code, 502)
+        self.assertEqual(m.call_count, 1)
+
+    def test_post_is_retried_on_connect_error(self, m, sleep):
+        m.register_uri('POST', self.URL, [{'exc': requests.exceptions.ConnectTimeout}, {'text': '{}'}])
+        resp = Transport().request('post', self.URL)
+        self.assertEqual(resp.status_code, 200)
+        m.register_uri('POST', self.URL, [{'exc': requests.exceptions.ReadTimeout}, {'text': '{}'}])
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            Transport().request('post', self.URL)
+
+    def test_body_is_rewound(self, m, sleep):
+        body = MagicMock()
+        m.register_uri('PUT', self.URL, [{'exc': requests.exceptions.ConnectionError}, {'text': '{}'}])
+        Transport().request('put', self.URL, data=body)
+        body.seek.assert_called_once_with(0)
+
+    def test_circuit_breaker(self, m, sleep):
+        m.register_uri('GET', self.URL, exc=requests.exceptions.ConnectionError)
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        transport = Transport(retry_policy=RetryPolicy(retries=1), circuit_breaker=breaker)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            transport.request('get', self.URL)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            transport.request('get', self.URL)
+        self.assertEqual(m.call_count, 3)
+        with self.assertRaises(CircuitOpenException):
+            transport.request('get', self.URL)
+        self.assertEqual(m.call_count, 3)
+
+        breaker.opened_at -= 60
+        m.register_uri('GET', self.URL, text='[]')
+        self.assertEqual(transport.request('get', self.URL).status_code, 200)
+        self.assertEqual(breaker.failures, 0)
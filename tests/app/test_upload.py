@@ -0,0 +1,81 @@
+import email.parser
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import mock
+
+from mist.upload import MultipartFileEncoder, UploadProgress
+
+
+class MultipartFileEncoderTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmp_dir, 'test-job.jar')
+        with open(self.file_path, 'wb') as f:
+            f.write(os.urandom(100000))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def read_all(self, encoder, size):
+        chunks = []
+        chunk = encoder.read(size)
+        while chunk:
+            chunks.append(chunk)
+            chunk = encoder.read(size)
+        return b''.join(chunks)
+
+    def test_encoded_body(self):
+        with MultipartFileEncoder('file', 'test-job_0.0.1.jar', self.file_path, chunk_size=4096) as encoder:
+            body = self.read_all(encoder, 8192)
+            self.assertEqual(len(body), len(encoder))
+        headers = 'Content-Type: {}\r\n\r\n'.format(encoder.content_type).encode('ascii')
+        if hasattr(email.parser, 'BytesParser'):
+            message = email.parser.BytesParser().parsebytes(headers + body)
+        else:  # python 2 parses byte strings
+            message = email.parser.Parser().parsestr(headers + body)
+        part = message.get_payload()[0]
+        self.assertEqual(part.get_param('name', header='content-disposition'), 'file')
+        self.assertEqual(part.get_filename(), 'test-job_0.0.1.jar')
+        with open(self.file_path, 'rb') as f:
+            self.assertEqual(part.get_payload(decode=True), f.read())
+
+    def test_progress(self):
+        calls = []
+        with MultipartFileEncoder('file', 'test.jar', self.file_path, progress=lambda *a: calls.append(a)) as encoder:
+            self.read_all(encoder, 30000)
+        self.assertEqual(calls[-1], (len(encoder), len(encoder)))
+        self.assertEqual([c[0] for c in calls], sorted(c[0] for c in calls))
+
+    def test_progress_reports_finished_upload(self):
+        progress = UploadProgress('test.jar', interval=3600)
+        with mock.patch('mist.upload.click.echo') as echo:
+            progress(10, 100)
+            progress(50, 100)
+            progress(100, 100)
+        self.assertEqual(echo.call_count, 1)
+        self.assertTrue(echo.call_args[0][0].startswith('Uploaded test.jar'))
+
+    def test_memory_does_not_depend_on_file_size(self):
+        try:
+            import tracemalloc
+        except ImportError:
+            self.skipTest('tracemalloc requires python 3.4')
+        sparse_path = os.path.join(self.tmp_dir, 'sparse.jar')
+        with open(sparse_path, 'wb') as f:
+            f.truncate(256 * 2 ** 20)
+        tracemalloc.start()
+        try:
+            with MultipartFileEncoder('file', 'sparse.jar', sparse_path) as encoder:
+                sent = 0
+                chunk = encoder.read(2 ** 16)
+                while chunk:
+                    sent += len(chunk)
+                    chunk = encoder.read(2 ** 16)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(sent, len(encoder))
+        self.assertLess(peak, 4 * 2 ** 20)
@@ -0,0 +1,45 @@
+from unittest import TestCase
+
+import requests_mock
+
+from mist.app import MistApp
+from mist.models import Job, Worker
+from mist.workers import BusyWorkers, WorkerFilter, kill_workers
+
+WORKERS = [
+    Worker('etl_1', 'akka.tcp://mist@10.0.0.1:2551'),
+    Worker('etl_2', 'akka.tcp://mist@10.0.0.2:2551'),
+    Worker('streaming_1', 'akka.tcp://mist@10.0.0.2:2552'),
+    Worker('etl2_1', 'akka.tcp://mist@10.0.0.3:2551'),
+    Worker('etl_streaming_3', 'akka.tcp://mist@10.0.0.3:2552'),
+]
+
+
+def names(worker_filter):
+    return [w.name for w in worker_filter.apply(WORKERS)]
+
+
+class WorkerFilterTest(TestCase):
+    def test_patterns(self):
+        self.assertEqual(names(WorkerFilter(['etl_?'])), ['etl_1', 'etl_2'])
+        self.assertEqual(names(WorkerFilter(context='etl')), ['etl_1', 'etl_2'])
+        self.assertEqual(names(WorkerFilter(context='etl_streaming')), ['etl_streaming_3'])
+        self.assertEqual(names(WorkerFilter(['*10.0.0.2*'])), ['etl_2', 'streaming_1'])
+        self.assertEqual(names(WorkerFilter([r':255[12]$', 'xyz'], regex=True)),
+                         ['etl_1', 'etl_2', 'streaming_1', 'etl2_1', 'etl_streaming_3'])
+        self.assertEqual(names(WorkerFilter([r'_1$'], regex=True, context='etl')), ['etl_1'])
+
+    def test_idle(self):
+        busy = BusyWorkers([
+            Job('1', 'foo', 'etl', 'http', 'started', worker_id='etl_2'),
+            Job('2', 'foo', 'streaming', 'http', 'started'),
+        ])
+        self.assertEqual(names(WorkerFilter(busy=busy)), ['etl_1', 'etl2_1', 'etl_streaming_3'])
+
+    @requests_mock.Mocker()
+    def test_kill_workers(self, m):
+        url = 'http://localhost:2004/v2/api/workers/'
+        m.register_uri('DELETE', url + 'etl_1', text='')
+        m.register_uri('DELETE', url + 'etl_2', status_code=500, text='boom')
+        results = dict(kill_workers(MistApp(), ['etl_1', 'etl_2'], parallelism=2))
+        self.assertEqual(results, {'etl_1': None, 'etl_2': '500 boom'})
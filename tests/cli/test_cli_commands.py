@@ -2,10 +2,11 @@ import json
 import os
 import shutil
 import sys
+import tempfile
 from unittest import TestCase
 
 from click import testing
-from mock import MagicMock, call
+from mock import MagicMock, call, patch
 from pyhocon import ConfigTree
 
 from mist import cli, app, models
@@ -110,7 +111,7 @@ class CliTest(TestCase):
         mist_app = app.MistApp()
         mist_app.workers = MagicMock(return_value=[models.Worker('test-worker-id', 'localhost:0', 'spark-ui')])
         mist_app.contexts = MagicMock(return_value=[models.Context('foo')])
-        mist_app.jobs = MagicMock(return_value=[models.Job('test-job-id', 'test', 'foo', 'cli', 'started')])
+        mist_app.iter_jobs = MagicMock(return_value=iter([models.Job('test-job-id', 'test', 'foo', 'cli', 'started')]))
         mist_app.functions = MagicMock(return_value=[models.Function('test', 'Test', 'foo')])
 
         def invoke_cmd(cmd):
@@ -142,6 +143,69 @@ class CliTest(TestCase):
         fn = mist_app.start_job.call_args[0][0]
         self.assertEqual(fn, 'simple')
 
+    def test_mist_cli_start_job_async(self):
+        mist_app = app.MistApp()
+        mist_app.submit_job = MagicMock(return_value='job-1')
+        res = self.runner.invoke(cli.start_job, args=('simple', '--async'), obj=mist_app)
+        self.assertEqual(res.exit_code, 0)
+        self.assertEqual(res.output, 'job-1\n')
+
+    @patch('mist.jobs.time.sleep')
+    def test_mist_cli_start_job_wait(self, sleep):
+        mist_app = app.MistApp()
+        mist_app.submit_job = MagicMock(return_value='job-1')
+        mist_app.get_job = MagicMock(side_effect=[
+            dict(jobId='job-1', status='started'),
+            dict(jobId='job-1', status='finished', jobResult={'result': 42}),
+        ])
+        res = self.runner.invoke(cli.start_job, args=('simple', '--wait'), obj=mist_app)
+        self.assertEqual(res.exit_code, 0)
+        self.assertEqual(json.loads(res.output.splitlines()[-1]),
+                         dict(success=True, payload={'result': 42}, errors=[]))
+
+        mist_app.get_job = MagicMock(return_value=dict(jobId='job-1', status='failed', error='boom'))
+        res = self.runner.invoke(cli.start_job, args=('simple', '--wait'), obj=mist_app)
+        self.assertEqual(res.exit_code, 1)
+        self.assertIn('boom', res.output)
+
+    def test_mist_cli_start_jobs(self):
+        mist_app = app.MistApp()
+        mist_app.submit_job = MagicMock(side_effect=lambda fn, req: 'job-{}'.format(req['n']))
+        res = self.runner.invoke(cli.start_jobs, args=('simple', '@-', '--parallelism', '2'),
+                                 input='{"n": 1}\n{"n": 2}\n', obj=mist_app)
+        self.assertEqual(res.exit_code, 0)
+        results = [json.loads(line) for line in res.output.splitlines() if line.startswith('{')]
+        self.assertEqual(sorted(r['jobId'] for r in results), ['job-1', 'job-2'])
+        self.assertIn('Submitted 2 jobs, 0 failed', res.output)
+
+    def test_mist_cli_bench(self):
+        mist_app = app.MistApp()
+        mist_app.get_function_json = MagicMock(return_value={'execute': {'numbers': {'type': 'MInt'}}})
+        mist_app.start_job = MagicMock(return_value=dict(success=True, payload=1, errors=[]))
+        res = self.runner.invoke(cli.bench, args=('simple', '-n', '10', '-c', '2'), obj=mist_app)
+        self.assertEqual(res.exit_code, 0)
+        self.assertEqual(mist_app.start_job.call_count, 10)
+        self.assertIn('numbers', mist_app.start_job.call_args[0][1])
+        self.assertIn('jobs_per_sec', res.output)
+
+    def test_mist_cli_bench_sizes_pool_before_requests(self):
+        mist_app = app.MistApp()
+        pool_sizes = []
+        mist_app.get_function_json = MagicMock(side_effect=lambda function: pool_sizes.append(
+            mist_app.transport.pool_size) or {'execute': {}})
+        mist_app.start_job = MagicMock(return_value=dict(success=True, payload=1, errors=[]))
+        res = self.runner.invoke(cli.bench, args=('simple', '-n', '10', '-c', '32'), obj=mist_app)
+        self.assertEqual(res.exit_code, 0)
+        self.assertEqual(pool_sizes, [32])
+
+    def test_mist_cli_bench_min_size_greater_than_max_size(self):
+        mist_app = app.MistApp()
+        mist_app.get_function_json = MagicMock()
+        res = self.runner.invoke(cli.bench, args=('simple', '--min-size', '3', '--max-size', '2'), obj=mist_app)
+        self.assertEqual(res.exit_code, 2)
+        self.assertIn('--min-size', res.output)
+        mist_app.get_function_json.assert_not_called()
+
     def test_mist_cli_kill_job_w_manual_accepting(self):
         mist_app = app.MistApp()
         mist_app.cancel_job = MagicMock(return_value=None)
@@ -164,6 +228,69 @@ class CliTest(TestCase):
         self.assertIn('Killed job', res.output)
         self.assertIn('test-job-id', res.output)
 
+    def test_mist_cli_kill_jobs(self):
+        mist_app = app.MistApp()
+        mist_app.iter_jobs = MagicMock(return_value=iter([
+            models.Job('job-1', 'foo', 'broken', 'http', 'queued'),
+            models.Job('job-2', 'foo', 'default', 'http', 'queued'),
+            models.Job('job-3', 'foo', 'broken', 'http', 'queued'),
+        ]))
+        mist_app.cancel_job = MagicMock(side_effect=[None, Exception('gone')])
+        res = self.runner.invoke(cli.kill_jobs, args=('--function', 'foo', '--context', 'broken', '--parallelism', '1'),
+                                 obj=mist_app, input='yes')
+        self.assertEqual(res.exit_code, 1)
+        mist_app.iter_jobs.assert_called_with('queued', None, 0, 100, function='foo')
+        self.assertEqual([c[0][0] for c in mist_app.cancel_job.call_args_list], ['job-1', 'job-3'])
+        self.assertIn('cancel 2 jobs?', res.output)
+        self.assertIn('Failed to cancel job job-3: gone', res.output)
+        self.assertIn('Cancelled 1 jobs, 1 failed', res.output)
+
+    def test_mist_cli_kill_jobs_sizes_pool_before_requests(self):
+        mist_app = app.MistApp(accept_all=True)
+        pool_sizes = []
+        mist_app.iter_jobs = MagicMock(side_effect=lambda *args, **kw: pool_sizes.append(
+            mist_app.transport.pool_size) or iter([models.Job('job-1', 'foo', 'bar', 'http', 'queued')]))
+        mist_app.cancel_job = MagicMock(return_value=None)
+        res = self.runner.invoke(cli.kill_jobs, args=('--parallelism', '32'), obj=mist_app)
+        self.assertEqual(res.exit_code, 0)
+        self.assertEqual(pool_sizes, [32])
+
+    def test_mist_cli_kill_workers_sizes_pool_before_requests(self):
+        mist_app = app.MistApp(accept_all=True)
+        pool_sizes = []
+        mist_app.workers = MagicMock(side_effect=lambda: pool_sizes.append(
+            mist_app.transport.pool_size) or [models.Worker('etl_1', 'localhost:1')])
+        mist_app.kill_worker = MagicMock(return_value=None)
+        res = self.runner.invoke(cli.kill_workers_cmd, args=('--context', 'etl', '--parallelism', '32'), obj=mist_app)
+        self.assertEqual(res.exit_code, 0)
+        self.assertEqual(pool_sizes, [32])
+
+    def test_mist_cli_kill_workers(self):
+        mist_app = app.MistApp()
+        mist_app.workers = MagicMock(return_value=[
+            models.Worker('etl_1', 'localhost:1'),
+            models.Worker('etl_2', 'localhost:2'),
+            models.Worker('ml_1', 'localhost:3'),
+        ])
+        mist_app.iter_jobs = MagicMock(return_value=iter([
+            models.Job('1', 'foo', 'etl', 'http', 'started', worker_id='etl_2'),
+        ]))
+        mist_app.kill_worker = MagicMock(return_value=None)
+        res = self.runner.invoke(cli.kill_workers_cmd, args=('--context', 'etl', '--idle', '--dry-run'), obj=mist_app)
+        self.assertEqual(res.exit_code, 0)
+        self.assertIn('etl_1', res.output)
+        self.assertNotIn('etl_2', res.output)
+        self.assertIn('Would stop 1 workers', res.output)
+        mist_app.kill_worker.assert_not_called()
+
+        res = self.runner.invoke(cli.kill_workers_cmd, args=('etl_*',), obj=mist_app, input='yes')
+        self.assertEqual(res.exit_code, 0)
+        self.assertIn('stop 2 workers?', res.output)
+        self.assertEqual(sorted(c[0][0] for c in mist_app.kill_worker.call_args_list), ['etl_1', 'etl_2'])
+
+        res = self.runner.invoke(cli.kill_workers_cmd, obj=mist_app)
+        self.assertEqual(res.exit_code, 2)
+
     def test_mist_cli_kill_worker_w_manual_accepting(self):
         mist_app = app.MistApp()
         mist_app.kill_worker = MagicMock(return_value=None)
@@ -224,3 +351,35 @@ class CliTest(TestCase):
         mist_app.parse_deployment.assert_has_calls(calls, any_order=True)
 
         self.assertEqual(res.exit_code, 0)
+
+    def test_mist_cli_apply_with_state_file(self):
+        mist_app = app.MistApp()
+        mist_app.update_deployments = MagicMock(return_value=True)
+        state_file = os.path.join(self.apply_job_path, 'state.json')
+
+        res = self.runner.invoke(cli.apply, ('--file', self.apply_job_path, '--state-file', state_file),
+                                 obj=mist_app)
+        self.assertEqual(res.exit_code, 0)
+        self.assertEqual(mist_app.apply_state.path, state_file)
+        self.assertEqual(mist_app.apply_state.server, 'localhost:2004')
+        self.assertFalse(mist_app.apply_state.force)
+
+        res = self.runner.invoke(cli.apply, ('--file', self.apply_job_path, '--state-file', state_file, '--full'),
+                                 obj=mist_app)
+        self.assertEqual(res.exit_code, 0)
+        self.assertTrue(mist_app.apply_state.force)
+
+    def test_mist_cli_apply_is_not_incremental_by_default(self):
+        mist_app = app.MistApp()
+        mist_app.cache_dir = tempfile.mkdtemp()
+        mist_app.update_deployments = MagicMock(return_value=True)
+        try:
+            res = self.runner.invoke(cli.apply, ('--file', self.apply_job_path), obj=mist_app)
+            self.assertEqual(res.exit_code, 0)
+            self.assertIsNone(mist_app.apply_state)
+
+            res = self.runner.invoke(cli.apply, ('--file', self.apply_job_path, '--incremental'), obj=mist_app)
+            self.assertEqual(res.exit_code, 0)
+            self.assertEqual(mist_app.apply_state.path, os.path.join(mist_app.cache_dir, 'apply-state.json'))
+        finally:
+            shutil.rmtree(mist_app.cache_dir)
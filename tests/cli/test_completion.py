@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import click
+import requests_mock
+from mock import patch
+
+from mist import cli
+from mist.app import MistApp
+from mist.completion import CompletionCache, complete, fetch_names
+
+
+class CompletionTest(TestCase):
+    MIST_APP_URL = 'http://localhost:2004/v2/api/'
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = CompletionCache.for_server(self.tmp_dir, 'localhost', 2004)
+        self.ctx = click.Context(cli.mist_cli)
+        self.ctx.params = dict(host='localhost', port=2004, cache_dir=self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    @patch('mist.completion.subprocess.Popen')
+    def test_fresh_cache_is_not_refreshed(self, popen):
+        self.cache.store('functions', ['spark-pi', 'spark-ctx', 'wordcount'])
+        self.assertEqual(complete(self.ctx, 'functions', 'spark'), ['spark-pi', 'spark-ctx'])
+        popen.assert_not_called()
+
+    @patch('mist.completion.subprocess.Popen')
+    def test_stale_cache_is_refreshed_in_background(self, popen):
+        self.assertEqual(complete(self.ctx, 'jobs', ''), [])
+        self.assertEqual(popen.call_count, 1)
+        args = popen.call_args[0][0]
+        self.assertEqual(args[-5:], ['mist.completion', self.cache.path, 'localhost', '2004', 'jobs'])
+
+        # refresh is already running
+        complete(self.ctx, 'jobs', '')
+        self.assertEqual(popen.call_count, 1)
+
+        # stale names are still offered while they are refreshed
+        self.cache.release_refresh('jobs')
+        with patch.object(CompletionCache, 'names', return_value=(['job-1'], False)):
+            self.assertEqual(complete(self.ctx, 'jobs', 'j'), ['job-1'])
+        self.assertEqual(popen.call_count, 2)
+
+    @requests_mock.Mocker()
+    def test_refresh(self, m):
+        m.register_uri('GET', self.MIST_APP_URL + 'workers', text='[{"name": "w1", "address": "a"}]')
+        m.register_uri('GET', self.MIST_APP_URL + 'jobs', text='[]')
+        self.assertTrue(self.cache.acquire_refresh('workers'))
+        self.cache.refresh(MistApp(), 'workers')
+        self.assertEqual(self.cache.names('workers'), (['w1'], True))
+        self.assertTrue(self.cache.acquire_refresh('workers'))
+
+        fetch_names(MistApp(), 'jobs')
+        self.assertEqual(m.last_request.qs['status'], ['queued', 'initialized', 'started'])
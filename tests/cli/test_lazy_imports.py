@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+HEAVY_MODULES = ('requests', 'pyhocon', 'texttable', 'multiprocessing')
+
+SCRIPT = """
+import sys
+from mist.cli import mist_cli
+try:
+    mist_cli(sys.argv[1:])
+except SystemExit:
+    pass
+heavy = [m for m in {modules!r} if m in sys.modules]
+sys.stderr.write('HEAVY=' + ','.join(heavy))
+"""
+
+
+class LazyImportsTest(TestCase):
+    def run_cli(self, *args):
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = dict(os.environ, PYTHONPATH=root)
+        proc = subprocess.Popen(
+            [sys.executable, '-c', SCRIPT.format(modules=HEAVY_MODULES)] + list(args),
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
+        )
+        out, err = proc.communicate()
+        return out.decode('utf-8'), err.decode('utf-8').rsplit('HEAVY=', 1)[1]
+
+    def test_help_does_not_import_heavy_modules(self):
+        out, heavy = self.run_cli('--help')
+        self.assertIn('apply', out)
+        self.assertEqual(heavy, '')
+
+    def test_subcommand_help_does_not_import_heavy_modules(self):
+        out, heavy = self.run_cli('start', 'job', '--help')
+        self.assertIn('--pretty', out)
+        self.assertEqual(heavy, '')
+
+    def test_version_does_not_import_heavy_modules(self):
+        _, heavy = self.run_cli('--version')
+        self.assertEqual(heavy, '')
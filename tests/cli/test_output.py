@@ -0,0 +1,57 @@
+import json
+from unittest import TestCase
+
+from click import testing
+from mock import MagicMock, patch
+
+from mist import cli, app, models
+from mist.output import write_table
+
+
+class OutputTest(TestCase):
+    def setUp(self):
+        self.runner = testing.CliRunner()
+        self.mist_app = app.MistApp()
+        self.mist_app.workers = MagicMock(return_value=[
+            models.Worker('w1', 'localhost:1', 'http://ui'),
+            models.Worker('w2', 'localhost:2'),
+        ])
+
+    def invoke(self, *args):
+        res = self.runner.invoke(cli.list_workers, args=args, obj=self.mist_app)
+        self.assertEqual(res.exit_code, 0, res.output)
+        return res.output
+
+    def test_table(self):
+        lines = self.invoke().splitlines()
+        self.assertEqual(lines[0], 'ID   ADDRESS       SPARK UI')
+        self.assertEqual(lines[2], 'w2   localhost:2')
+
+    def test_json(self):
+        self.assertEqual(json.loads(self.invoke('-o', 'json')), [
+            {'id': 'w1', 'address': 'localhost:1', 'spark_ui': 'http://ui'},
+            {'id': 'w2', 'address': 'localhost:2', 'spark_ui': ''},
+        ])
+        self.mist_app.workers.return_value = []
+        self.assertEqual(json.loads(self.invoke('-o', 'json')), [])
+
+    def test_jsonl(self):
+        lines = self.invoke('-o', 'jsonl').splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], ['w1', 'w2'])
+
+    def test_delimited(self):
+        self.assertEqual(self.invoke('-o', 'csv'), 'id,address,spark_ui\nw1,localhost:1,http://ui\nw2,localhost:2,\n')
+        self.assertEqual(self.invoke('--output', 'tsv').splitlines()[1], 'w1\tlocalhost:1\thttp://ui')
+
+    def test_watch_requires_table(self):
+        res = self.runner.invoke(cli.list_workers, args=('--watch', '-o', 'json'), obj=self.mist_app)
+        self.assertEqual(res.exit_code, 2)
+
+    @patch('mist.output.click.echo')
+    def test_table_widths_from_sample(self, echo):
+        rows = (['row-{}'.format('x' * i), i] for i in range(5))
+        write_table(rows, ['NAME', 'N'], sample_size=2)
+        lines = [c[0][0] for c in echo.call_args_list]
+        self.assertEqual(lines[0], 'NAME    N')
+        self.assertEqual(lines[2], 'row-x   1')
+        self.assertEqual(lines[5], 'row-xxxx   4')
@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+from click import testing
+from mock import MagicMock, patch
+
+from mist import cli, app, models
+from mist.watch import Screen, Watcher, merge_rows
+
+
+class WatchTest(TestCase):
+    def test_merge_rows(self):
+        previous = [['a', 'started'], ['b', 'started'], ['c', 'queued']]
+        rows = [['d', 'queued'], ['c', 'started'], ['a', 'started']]
+        ordered, changed = merge_rows(previous, rows)
+        self.assertEqual(ordered, [['a', 'started'], ['c', 'started'], ['d', 'queued']])
+        self.assertEqual(changed, {'b', 'c', 'd'})
+
+    @patch('mist.watch.click.echo')
+    def test_screen_redraws_changed_lines(self, echo):
+        screen = Screen(tty=True)
+        screen.update(['header', 'a started', 'b started'])
+        screen.update(['header', 'a finished', 'b started'])
+        self.assertEqual(echo.call_args[0][0], '\x1b[3A\n\r\x1b[2Ka finished\n\n')
+        screen.update(['header'])
+        self.assertEqual(echo.call_args[0][0], '\x1b[3A\n\x1b[J')
+
+    @patch('mist.watch.time.sleep')
+    def test_adaptive_interval(self, sleep):
+        snapshots = iter([[['a', '1']], [['a', '1']], [['a', '1']], [['a', '2']]])
+        screen = MagicMock()
+        watcher = Watcher(lambda: next(snapshots), lambda rows: '\n'.join(r[1] for r in rows), 1.0, 2.0, screen)
+        watcher.run(iterations=4)
+        intervals = [round(c[0][0], 1) for c in sleep.call_args_list]
+        self.assertEqual(intervals, [1.0, 1.5, 2.0])
+        self.assertEqual(screen.update.call_args[0][0], ['2'])
+        self.assertTrue(screen.update.call_args[0][1][0].startswith('Every 1.0s'))
+
+    @patch('mist.watch.time.sleep')
+    @patch('mist.watch.time.strftime', side_effect=['10:00:00', '10:00:02', '10:00:05'])
+    @patch('mist.watch.click.echo')
+    def test_non_tty_prints_changed_frames_only(self, echo, strftime, sleep):
+        snapshots = iter([[['a', '1']], [['a', '1']], [['a', '2']]])
+        watcher = Watcher(lambda: next(snapshots), lambda rows: '\n'.join(r[1] for r in rows), screen=Screen(tty=False))
+        watcher.run(iterations=3)
+        frames = [c[0][0] for c in echo.call_args_list]
+        self.assertEqual(len(frames), 2)
+        self.assertIn('10:00:00', frames[0])
+        self.assertTrue(frames[1].endswith('\n2\n'))
+
+    @patch('mist.watch.time.sleep', side_effect=[None, KeyboardInterrupt])
+    def test_list_jobs_watch(self, sleep):
+        mist_app = app.MistApp()
+        mist_app.iter_jobs = MagicMock(side_effect=[
+            [models.Job('job-1', 'simple', 'foo', 'CLI', 'queued')],
+            [models.Job('job-1', 'simple', 'foo', 'CLI', 'started')],
+        ])
+        runner = testing.CliRunner()
+        res = runner.invoke(cli.list_jobs, ['--watch', '--interval', '0.5', '--filter', 'queued,started'],
+                            obj=mist_app)
+        self.assertEqual(res.exit_code, 0)
+        mist_app.iter_jobs.assert_called_with('queued,started', None, 0, 100, function=None)
+        self.assertEqual(mist_app.iter_jobs.call_count, 2)
+        self.assertEqual(res.output.count('job-1'), 2)
+        self.assertIn('started', res.output)
@@ -54,4 +54,16 @@ class JobTest(TestCase):
 
     def test_job_header(self):
         self.assertListEqual(models.Job.header,
-                             ['UID', 'START TIME', 'NAMESPACE', 'EXT ID', 'FUNCTION', 'SOURCE', 'STATUS'])
\ No newline at end of file
+                             ['UID', 'START TIME', 'NAMESPACE', 'EXT ID', 'FUNCTION', 'SOURCE', 'STATUS'])
+
+    def test_job_is_compact(self):
+        data = [dict(jobId=str(i), function=''.join(['f', 'oo']), context='bar', source='http', status='finished',
+                     startTime=0) for i in range(2)]
+        first, second = map(models.Job.from_json, data)
+        self.assertFalse(hasattr(first, '__dict__'))
+        self.assertIsNot(data[0]['function'], data[1]['function'])
+        self.assertIs(first.function, second.function)
+        self.assertEqual(first._start_time, 0)
+        self.assertEqual(first.start_time, datetime.datetime.fromtimestamp(0))
+        self.assertIs(first.start_time, first.start_time)
+        self.assertIsNone(models.Job('test', 'foo', 'bar', 'http', 'finished').start_time)